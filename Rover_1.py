@@ -1,78 +1,263 @@
+import numpy as np
 import pandas as pd
-from sklearn.ensemble import RandomForestClassifier
-from sklearn.model_selection import train_test_split
-from sklearn.preprocessing import StandardScaler
-import matplotlib.pyplot as plt
-import seaborn as sns
+import argparse
+import hashlib
+import json
+import os
 import random
 import time
+from concurrent.futures import ThreadPoolExecutor
 
-# Load the datasets for the three areas
-def load_data():
-    areas = ['Astraeon Basin', 'Helios Ridge', 'Elysium Crater']
+import instrumentation
+import storage
+import training
+
+# sklearn, matplotlib and seaborn are imported where they are used, so
+# importing this module for loading or preprocessing stays fast.
+
+FEATURES = ['Temperature', 'Oxygen_Percentage', 'Soil_Quality', 'Water_Presence', 
+            'UV_Radiation', 'Wind_Speed', 'Soil_Nutrients', 'Pressure', 
+            'Solar_Radiation', 'Gravity']
+
+# Files of each area listed in a manifest, relative to the manifest's directory
+def manifest_sources(manifest):
+    """
+    A manifest is a JSON file with either an "areas" list, whose areas are
+    datasets stored next to the manifest, or, as written by sharding.py, a
+    "shards" list whose entries name their area and file. Returns a dict of
+    area -> list of shard CSV paths (in shard order), or area -> None for
+    areas stored as a single dataset in the manifest's directory.
+    """
+    with open(manifest) as f:
+        contents = json.load(f)
+    directory = os.path.dirname(os.path.abspath(manifest))
+    if 'shards' in contents:
+        sources = {}
+        for shard in sorted(contents['shards'], key=lambda shard: (shard['area'], shard['start'])):
+            file = shard.get('file') or f"{shard['area']}_data.{shard['index']:05d}.csv"
+            sources.setdefault(shard['area'], []).append(os.path.join(directory, file))
+        return sources
+    return {area: None for area in contents.get('areas', [])}
+
+# Find the surface areas to survey, from a manifest or from the data files present
+def discover_areas(manifest=None, directory='.'):
+    """
+    Without a manifest (see manifest_sources), every dataset in
+    `directory` that has all FEATURES columns is an area.
+    """
+    if manifest is not None:
+        return list(manifest_sources(manifest))
+    return [name for name in storage.list_datasets(directory)
+            if set(FEATURES).issubset(storage.read_columns(name, directory))]
+
+# Load the datasets for the survey areas
+def load_data(areas=None, manifest=None, workers=8):
+    sources = manifest_sources(manifest) if manifest is not None else {}
+    directory = os.path.dirname(os.path.abspath(manifest)) if manifest is not None else '.'
+    if areas is None:
+        areas = list(sources) if manifest is not None else discover_areas()
     data = {}
-    
-    for area in areas:
-        try:
-            df = pd.read_csv(f'{area}_data.csv')  # Load the CSV file for each area
-            print(f"Loaded {area} data with columns: {df.columns}")
-            data[area] = df
-        except Exception as e:
-            print(f"Error loading data for {area}: {e}")
-        
+
+    def load(area):
+        shard_paths = sources.get(area)
+        if shard_paths:
+            # A sharded area is the concatenation of its shards, in order
+            return pd.concat([pd.read_csv(path, usecols=FEATURES)[FEATURES] for path in shard_paths],
+                             ignore_index=True)
+        # Load only the model features for each area
+        return storage.load_frame(area, columns=FEATURES, directory=directory)
+
+    # Loading is mostly I/O, so a thread pool overlaps the areas
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = {area: pool.submit(load, area) for area in areas}
+        for area, future in futures.items():
+            try:
+                df = future.result()
+                print(f"Loaded {area} data with columns: {df.columns}")
+                data[area] = df
+            except Exception as e:
+                print(f"Error loading data for {area}: {e}")
+
+    if not data:
+        raise ValueError(f"No survey area could be loaded (tried: {', '.join(areas) or 'none'})")
     return data
 
-# Preprocess the data (normalize, handle missing values, etc.)
-def preprocess_data(df):
-    df.fillna(df.mean(), inplace=True)
-    features = ['Temperature', 'Oxygen_Percentage', 'Soil_Quality', 'Water_Presence', 
-                'UV_Radiation', 'Wind_Speed', 'Soil_Nutrients', 'Pressure', 
-                'Solar_Radiation', 'Gravity']
-    missing_cols = [col for col in features if col not in df.columns]
-    if missing_cols:
-        print(f"Missing columns: {missing_cols}")
-        return None, None
+# The latest fitted pipeline, keyed on the content hash of the dataset it was
+# fitted on; only one is kept, so a long-running process does not accumulate them
+_pipeline_cache = {}
+
+def dataset_hash(data):
+    digest = hashlib.sha256()
+    for area, df in data.items():
+        digest.update(area.encode())
+        digest.update(pd.util.hash_pandas_object(df, index=False).to_numpy().tobytes())
+    return digest.hexdigest()
+
+# Compute per-area statistics, the sustainability label and one scaler in a single pass
+def fit_pipeline(data):
+    """
+    Returns a dict with the per-area column means and row counts, the
+    best area (highest mean oxygen plus soil quality, whose rows are
+    labelled sustainable) and a StandardScaler fitted across all areas.
+    Results are cached, so training and prediction on the same data
+    share one fitted pipeline.
+    """
+    key = dataset_hash(data)
+    if key in _pipeline_cache:
+        return _pipeline_cache[key]
+
+    from sklearn.preprocessing import StandardScaler
+
+    oxygen, soil = FEATURES.index('Oxygen_Percentage'), FEATURES.index('Soil_Quality')
+    stats = {}
     scaler = StandardScaler()
-    scaled_data = scaler.fit_transform(df[features])
-    return scaled_data, df
-
-def define_labels(data):
-    scores = {area: data[area]['Oxygen_Percentage'].mean() + data[area]['Soil_Quality'].mean() for area in data}
-    best_area = max(scores, key=scores.get)
-    return best_area
-
-def train_model(data):
-    model = RandomForestClassifier(n_estimators=100, random_state=42)
-    X = []
-    y = []
     for area, df in data.items():
-        X_area, _ = preprocess_data(df)
-        if X_area is None:
+        missing_cols = [col for col in FEATURES if col not in df.columns]
+        if missing_cols:
+            print(f"Missing columns for {area}: {missing_cols}")
             continue
-        best_area = define_labels(data)
-        y_area = [1 if area == best_area else 0] * len(df)
-        X.extend(X_area)
-        y.extend(y_area)
-    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
-    model.fit(X_train, y_train)
+        # Plain arrays from here on; per-area pandas and sklearn validation
+        # overhead would otherwise dominate surveys with many small areas
+        values = feature_values(df)
+        means = np.nanmean(values, axis=0)
+        stats[area] = {
+            'means': means,
+            'rows': len(df),
+            'score': means[oxygen] + means[soil],
+        }
+        scaler.partial_fit(fill_missing(values, means))
+
+    if not stats:
+        raise ValueError(f"No area has all the feature columns: {FEATURES}")
+    pipeline = {
+        'key': key,
+        'stats': stats,
+        'best_area': max(stats, key=lambda area: stats[area]['score']),
+        'scaler': scaler,
+    }
+    _pipeline_cache.clear()
+    _pipeline_cache[key] = pipeline
+    return pipeline
+
+# Feature columns of an area as a float64 array
+def feature_values(df):
+    if list(df.columns) != FEATURES:
+        df = df[FEATURES]
+    return df.to_numpy(dtype=np.float64)
+
+# Replace NaNs with the area's column means (no copy when there are none)
+def fill_missing(values, means):
+    missing = np.isnan(values)
+    if missing.any():
+        values = np.where(missing, means, values)
+    return values
+
+# Scale one area with the shared pipeline
+def transform_area(pipeline, area, df):
+    """
+    Fills missing values with the area's column means and standardizes
+    with the pipeline's scaler, computed directly on the array as
+    StandardScaler.transform does.
+    """
+    scaler = pipeline['scaler']
+    values = fill_missing(feature_values(df), pipeline['stats'][area]['means'])
+    values = values - scaler.mean_
+    values /= scaler.scale_
+    return values
+
+# Allocate the float32 feature matrix in RAM, or on disk when mmap_path is given
+def allocate_features(n_rows, mmap_path=None):
+    if mmap_path is None:
+        return np.empty((n_rows, len(FEATURES)), dtype=np.float32)
+    return np.lib.format.open_memmap(mmap_path, mode='w+', dtype=np.float32,
+                                     shape=(n_rows, len(FEATURES)))
+
+# Scaled features and labels of all areas, in train/test split order
+def build_training_matrix(data, pipeline=None, mmap_path=None):
+    """
+    Scales each area straight into one preallocated float32 matrix (memory
+    mapped at `mmap_path` if given), with rows already placed in split
+    order so the train and test sets are views rather than copies.
+    Returns X, y and the number of test rows, which come first.
+    """
+    if pipeline is None:
+        pipeline = fit_pipeline(data)
+    areas = list(pipeline['stats'])
+    n_rows = sum(pipeline['stats'][area]['rows'] for area in areas)
+
+    order, n_test = training.split_order(n_rows)
+    slots = np.empty(n_rows, dtype=np.int64)
+    slots[order] = np.arange(n_rows)
+
+    X = allocate_features(n_rows, mmap_path)
+    y = np.empty(n_rows, dtype=np.int8)
+    offset = 0
+    for area in areas:
+        rows = pipeline['stats'][area]['rows']
+        area_slots = slots[offset:offset + rows]
+        X[area_slots] = transform_area(pipeline, area, data[area])
+        y[area_slots] = 1 if area == pipeline['best_area'] else 0
+        offset += rows
+    return X, y, n_test
+
+def train_model(data, mmap_path=None, pipeline=None, n_jobs=None):
+    from sklearn.ensemble import RandomForestClassifier
+
+    model = training.build_forest(RandomForestClassifier, n_jobs, **training.tuned_params('rover_1'))
+    X, y, n_test = build_training_matrix(data, pipeline, mmap_path)
+    X_train, X_test, y_train, y_test = X[n_test:], X[:n_test], y[n_test:], y[:n_test]
+    training.fit_forest(model, X_train, y_train)
     accuracy = model.score(X_test, y_test)
     print(f"Model Accuracy: {accuracy * 100:.2f}%")
     return model
 
-def visualize_feature_importance(model):
-    feature_importances = model.feature_importances_
-    features = ['Temperature', 'Oxygen_Percentage', 'Soil_Quality', 'Water_Presence', 
-                'UV_Radiation', 'Wind_Speed', 'Soil_Nutrients', 'Pressure', 
-                'Solar_Radiation', 'Gravity']
-    plt.figure(figsize=(10, 6))
+def visualize_feature_importance(model, show=True):
+    return plot_feature_importance(model.feature_importances_, show)
+
+def plot_feature_importance(feature_importances, show=True):
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+
+    features = FEATURES
+    fig = plt.figure(figsize=(10, 6))
     sns.barplot(x=feature_importances, y=features)
     plt.title('Feature Importance for Area Sustainability Prediction')
     plt.xlabel('Importance')
     plt.ylabel('Features')
-    plt.show()
+    if show:
+        plt.show()
+    return fig
+
+# Rows of an area scaled and predicted at a time by rank_areas
+RANK_CHUNK_ROWS = 100_000
+
+# Rank all areas with batched predictions
+def rank_areas(model, pipeline, data, top_k=1, by='sum'):
+    """
+    Scales and predicts each area in chunks of RANK_CHUNK_ROWS rows, so
+    memory stays bounded however large the survey, and aggregates the
+    predictions per area: `by='sum'` counts the rows predicted
+    sustainable, `by='mean'` gives their fraction, which does not favour
+    areas with more readings. Returns the top `top_k` (area, score)
+    pairs, best first.
+    """
+    areas = list(pipeline['stats'])
+    rows = np.array([pipeline['stats'][area]['rows'] for area in areas])
+    scores = np.zeros(len(areas))
+    for i, area in enumerate(areas):
+        for start in range(0, rows[i], RANK_CHUNK_ROWS):
+            chunk = data[area].iloc[start:start + RANK_CHUNK_ROWS]
+            X = transform_area(pipeline, area, chunk).astype(np.float32)
+            scores[i] += training.predict_batch(model, X).sum()
+    if by == 'mean':
+        scores = scores / np.maximum(rows, 1)
+
+    # Stable sort on the negated scores keeps ties in area order, like max()
+    top = np.argsort(-scores, kind='stable')[:top_k]
+    return [(areas[i], float(scores[i])) for i in top]
 
 # Add spice with randomized rover messages and actions
-def show_rover_message(stage):
+def show_rover_message(stage, delay=2):
     messages = {
         "start": ["Rover initializing...", "Beginning search for sustainable areas...", "Scanning planet surface..."],
         "processing": ["Analyzing data streams...", "Compiling oxygen and soil quality metrics...", "Evaluating life sustainability scores..."],
@@ -80,19 +265,63 @@ def show_rover_message(stage):
         "end": [f"Mission success! Area marked for colonization.", f"Operation complete! Suitable zone secured."]
     }
     print(random.choice(messages[stage]))
-    time.sleep(2)
+    if delay:
+        time.sleep(delay)
 
 # Run the rover analysis with dynamic messages
-def rover_analysis():
-    show_rover_message("start")
-    data = load_data()
-    model = train_model(data)
-    visualize_feature_importance(model)
-    area_predictions = {area: model.predict(preprocess_data(df)[0]) for area, df in data.items()}
-    predicted_best_area = max(area_predictions, key=lambda area: area_predictions[area].sum())
-    show_rover_message("found")
+def rover_analysis(batch=False, profile=False, trace_memory=False, manifest=None, top_k=1, mmap_path=None):
+    """
+    Runs load -> preprocess -> train -> visualize -> predict and returns a
+    run report with the wall time, CPU time and memory of each stage.
+    In batch mode the message delays are skipped and the plot is not
+    shown. `profile` and `trace_memory` add cProfile and tracemalloc data.
+    With `mmap_path`, the training matrix is memory-mapped to that file.
+    """
+    delay = 0 if batch else 2
+    report = instrumentation.start_report(profile, trace_memory)
+
+    show_rover_message("start", delay)
+    with instrumentation.stage(report, "load"):
+        data = load_data(manifest=manifest)
+    with instrumentation.stage(report, "preprocess"):
+        pipeline = fit_pipeline(data)
+    with instrumentation.stage(report, "train"):
+        model = train_model(data, mmap_path=mmap_path, pipeline=pipeline)
+    with instrumentation.stage(report, "visualize"):
+        fig = visualize_feature_importance(model, show=not batch)
+        if batch:
+            import matplotlib.pyplot as plt
+            plt.close(fig)
+    with instrumentation.stage(report, "predict"):
+        ranking = rank_areas(model, pipeline, data, top_k)
+        predicted_best_area = ranking[0][0]
+    show_rover_message("found", delay)
     print(f"The most sustainable area for life is: {predicted_best_area}")
-    show_rover_message("end")
+    if top_k > 1:
+        for rank, (area, score) in enumerate(ranking, 1):
+            print(f"{rank}. {area} ({score:.0f} sustainable readings)")
+    show_rover_message("end", delay)
+
+    result = instrumentation.finish_report(report)
+    result['best_area'] = predicted_best_area
+    result['ranking'] = ranking
+    return result
 
 if __name__ == "__main__":
-    rover_analysis()
+    parser = argparse.ArgumentParser(description="Find the most sustainable area for life.")
+    parser.add_argument('--batch', action='store_true', help="No message delays and no plot window")
+    parser.add_argument('--profile', action='store_true', help="Capture a cProfile of the stages")
+    parser.add_argument('--trace-memory', action='store_true', help="Record tracemalloc peaks per stage")
+    parser.add_argument('--report', help="Write the run report to this JSON file")
+    parser.add_argument('--manifest', help="JSON file listing the areas to survey")
+    parser.add_argument('--top-k', type=int, default=1, help="Number of ranked areas to report")
+    parser.add_argument('--mmap-path', help="Memory-map the training matrix to this .npy file")
+    args = parser.parse_args()
+
+    result = rover_analysis(args.batch, args.profile, args.trace_memory, args.manifest, args.top_k, args.mmap_path)
+    print(instrumentation.format_report(result))
+    if 'profile' in result:
+        print(result['profile'])
+    if args.report:
+        with open(args.report, 'w') as f:
+            json.dump(result, f, indent=2)
@@ -1,65 +1,92 @@
-import matplotlib.pyplot as plt
-from matplotlib.animation import FuncAnimation
+import numpy as np
 import pandas as pd
 import random
 
 # Import your existing functions from the main script
 from rover_2_3 import (
-    load_data,
-    preprocess_farming_data,
-    preprocess_recycling_data,
-    train_farming_model,
-    train_recycling_model,
+    load_or_train_models,
     generate_random_conditions,
     make_predictions
 )
 
-# Initialize data
-farming_data, recycling_data = load_data()
-farming_data, label_encoders = preprocess_farming_data(farming_data)
-recycling_data = preprocess_recycling_data(recycling_data)
+# Models are loaded (or trained) on first use rather than at import
+_models = None
 
-farming_model = train_farming_model(farming_data)
-recycling_model = train_recycling_model(recycling_data)
+def get_models():
+    global _models
+    if _models is None:
+        # From the model cache when the data is unchanged; flattened, since
+        # every frame predicts a single row
+        _models = load_or_train_models(flat=True)
+    return _models
 
-# Initialize Matplotlib figure and axes
-fig, ax = plt.subplots()
-x_data, y_data_farming, y_data_recycling = [], [], []
+FRAMES = 50  # Number of frames
+WINDOW = 50  # Frames kept on screen
 
-# Farming and recycling lines
-line_farming, = ax.plot([], [], label="Farming Rover (Crop Health)", color="green")
-line_recycling, = ax.plot([], [], label="Recycling Rover (Waste Reduction)", color="blue")
+# Build the live prediction animation; returns the figure and the animation
+def create_animation(frames=FRAMES, window=WINDOW, seed=None, show=True):
+    import matplotlib.pyplot as plt
+    from matplotlib.animation import FuncAnimation
 
-# Set plot limits and labels
-ax.set_xlim(0, 50)  # Number of frames
-ax.set_ylim(0, 100)  # Prediction range
-ax.set_xlabel("Time (frames)")
-ax.set_ylabel("Prediction Values")
-ax.legend()
+    # A seed makes the random conditions, and so every frame, reproducible
+    if seed is not None:
+        random.seed(seed)
 
-# Update function for animation
-def update(frame):
-    global x_data, y_data_farming, y_data_recycling
+    farming_model, recycling_model, _ = get_models()
 
-    # Generate random conditions
-    farming_conditions, recycling_conditions = generate_random_conditions()
-    
-    # Make predictions
-    farming_output, recycling_output = make_predictions(farming_model, recycling_model, farming_conditions, recycling_conditions)
+    # Initialize Matplotlib figure and axes
+    fig, ax = plt.subplots()
 
-    # Append new data
-    x_data.append(frame)
-    y_data_farming.append(farming_output)
-    y_data_recycling.append(recycling_output)
+    # Preallocated buffers for the visible window. Every value is written twice,
+    # at slot and slot + window, so the last `window` frames are always the
+    # contiguous view [slot + 1, slot + 1 + window) and nothing grows per frame.
+    x_data = np.full(2 * window, np.nan)
+    y_data_farming = np.full(2 * window, np.nan)
+    y_data_recycling = np.full(2 * window, np.nan)
 
-    # Update the lines
-    line_farming.set_data(x_data, y_data_farming)
-    line_recycling.set_data(x_data, y_data_recycling)
+    # Farming and recycling lines
+    line_farming, = ax.plot([], [], label="Farming Rover (Crop Health)", color="green")
+    line_recycling, = ax.plot([], [], label="Recycling Rover (Waste Reduction)", color="blue")
 
-    return line_farming, line_recycling
+    # Set plot limits and labels
+    ax.set_xlim(0, window)
+    ax.set_ylim(0, 100)  # Prediction range
+    ax.set_xlabel("Time (frames)")
+    ax.set_ylabel("Prediction Values")
+    ax.legend()
 
-# Create animation
-ani = FuncAnimation(fig, update, frames=range(50), blit=True, repeat=False)
+    # Update function for animation
+    def update(frame):
+        # Generate random conditions
+        farming_conditions, recycling_conditions = generate_random_conditions()
 
-# Display the animation
-plt.show()
+        # Make predictions
+        farming_output, recycling_output = make_predictions(farming_model, recycling_model, farming_conditions, recycling_conditions)
+
+        # Store the new data in the window buffers
+        slot = frame % window
+        for buffer, value in ((x_data, frame), (y_data_farming, farming_output), (y_data_recycling, recycling_output)):
+            buffer[slot] = buffer[slot + window] = value
+
+        # Update the lines with the visible window
+        if frame < window:
+            visible = slice(0, frame + 1)
+        else:
+            visible = slice(slot + 1, slot + 1 + window)
+            ax.set_xlim(frame - window + 1, frame + 1)
+        line_farming.set_data(x_data[visible], y_data_farming[visible])
+        line_recycling.set_data(x_data[visible], y_data_recycling[visible])
+
+        return line_farming, line_recycling
+
+    # Create animation; blitting keeps the axes static, so it is only used
+    # while the whole run fits in the window and the x-axis never scrolls
+    ani = FuncAnimation(fig, update, frames=range(frames), blit=frames <= window, repeat=False)
+
+    # Display the animation
+    if show:
+        plt.show()
+    return fig, ani
+
+if __name__ == "__main__":
+    create_animation()
@@ -0,0 +1,222 @@
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+
+import dataset
+import dataset_2
+import Rover_1
+import rover_2_3
+import warp
+
+SEED = 0
+
+# Rows per surface area / simulated telemetry days / calls or batch rows, per scale
+SCALES = {
+    'small': {'rows': 1_000, 'days': 30, 'calls': 100, 'batch': 10_000},
+    'medium': {'rows': 10_000, 'days': 365, 'calls': 1_000, 'batch': 100_000},
+    'large': {'rows': 100_000, 'days': 3650, 'calls': 10_000, 'batch': 1_000_000},
+}
+
+# Wall time of one call of fn
+def measure_time(fn):
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        fn()
+    return time.perf_counter() - start
+
+# Peak traced memory of one call of fn, in MB. Run separately from the
+# timing, since tracing slows allocation-heavy code down considerably.
+def measure_memory(fn):
+    tracemalloc.start()
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            fn()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak / 2**20
+
+# Benchmark cases for one scale, as (name, setup, fn); setup runs untimed
+# and returns the arguments fn is called with.
+def cases(scale):
+    rows, days, calls, batch = (scale[key] for key in ('rows', 'days', 'calls', 'batch'))
+
+    def surface_data():
+        dataset.generate_and_save_data(rows=rows, seed=SEED)
+        return ()
+
+    def telemetry_data():
+        dataset_2.random.seed(SEED)
+        dataset_2.generate_and_save_data(days=days)
+        return ()
+
+    # Load once untimed, so the timed load reads the converted binary copy
+    def warm_surface_data():
+        surface_data()
+        Rover_1.load_data()
+        return ()
+
+    def warm_telemetry_data():
+        telemetry_data()
+        rover_2_3.load_data()
+        return ()
+
+    def loaded_telemetry_with_time():
+        telemetry_data()
+        return rover_2_3.load_data(with_time=True)
+
+    def window_features(farming_data, recycling_data):
+        rover_2_3.add_window_features(farming_data, 'Farming_Rover_Area')
+        rover_2_3.add_window_features(recycling_data, 'Recycling_Rover_Area')
+
+    def loaded_surface_data():
+        surface_data()
+        return (Rover_1.load_data(),)
+
+    def trained_rover_models():
+        telemetry_data()
+        farming_data, recycling_data = rover_2_3.load_data()
+        farming_data, _ = rover_2_3.preprocess_farming_data(farming_data)
+        recycling_data = rover_2_3.preprocess_recycling_data(recycling_data)
+        return rover_2_3.train_farming_model(farming_data), rover_2_3.train_recycling_model(recycling_data)
+
+    def flat_rover_models():
+        import flat_forest
+        return tuple(flat_forest.flatten(model) for model in trained_rover_models())
+
+    def single_predictions(farming_model, recycling_model):
+        rover_2_3.random.seed(SEED)
+        for _ in range(calls):
+            rover_2_3.make_predictions(farming_model, recycling_model, *rover_2_3.generate_random_conditions())
+
+    def batch_predictions(farming_model, recycling_model):
+        conditions = rover_2_3.generate_random_conditions_batch(batch, np.random.default_rng(SEED))
+        rover_2_3.make_predictions_batch(farming_model, recycling_model, *conditions)
+
+    def journeys():
+        np.random.seed(SEED)
+        for warp_factor in np.linspace(1, 10, calls):
+            warp.simulate_journey(warp_factor)
+
+    def colonies():
+        for population in range(1, calls + 1):
+            warp.colony_setup(population, 1e6)
+
+    return [
+        ('dataset.generate_and_save_data', lambda: (), surface_data),
+        ('dataset_2.generate_and_save_data', lambda: (), telemetry_data),
+        ('Rover_1.load_data (first load)', surface_data, Rover_1.load_data),
+        ('Rover_1.load_data', warm_surface_data, Rover_1.load_data),
+        ('rover_2_3.load_data (first load)', telemetry_data, rover_2_3.load_data),
+        ('rover_2_3.load_data', warm_telemetry_data, rover_2_3.load_data),
+        ('rover_2_3.add_window_features', loaded_telemetry_with_time, window_features),
+        ('Rover_1.train_model', loaded_surface_data, Rover_1.train_model),
+        ('rover_2_3.make_predictions', trained_rover_models, single_predictions),
+        ('rover_2_3.make_predictions (flat)', flat_rover_models, single_predictions),
+        ('rover_2_3.make_predictions_batch', trained_rover_models, batch_predictions),
+        ('warp.simulate_journey', lambda: (), journeys),
+        ('warp.simulate_journeys', lambda: (), lambda: warp.simulate_journeys(np.linspace(1, 10, 10), batch, SEED)),
+        ('warp.colony_setup', lambda: (), colonies),
+        ('warp.simulate_colonies', lambda: (), lambda: warp.simulate_colonies(np.arange(1, batch + 1), 1e6, years=100)),
+    ]
+
+# The rover modules import these lazily; imported up front, so no case
+# times an import that depends on which cases ran before it
+def import_dependencies():
+    import flat_forest  # noqa: F401
+    import joblib  # noqa: F401
+    import matplotlib.pyplot  # noqa: F401
+    import seaborn  # noqa: F401
+    import sklearn.ensemble  # noqa: F401
+    import sklearn.preprocessing  # noqa: F401
+    import telemetry_features  # noqa: F401
+
+# Run setup and then measure fn in a fresh scratch directory, with in-process
+# caches cleared, so every measured run starts from the same cold state
+def measure_case(setup, fn, measure):
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as scratch:
+        os.chdir(scratch)
+        try:
+            Rover_1._pipeline_cache.clear()
+            with contextlib.redirect_stdout(io.StringIO()):
+                args = setup()
+            return measure(lambda: fn(*args))
+        finally:
+            os.chdir(cwd)
+
+# Run every case at every scale
+def run(scales, repeat=1, only=None, memory=True):
+    import_dependencies()
+    results = []
+    for scale_name in scales:
+        scale = SCALES[scale_name]
+        for name, setup, fn in cases(scale):
+            if only and not any(pattern in name for pattern in only):
+                continue
+            seconds = min(measure_case(setup, fn, measure_time) for _ in range(repeat))
+            peak_mb = measure_case(setup, fn, measure_memory) if memory else None
+            results.append({'case': name, 'scale': scale_name, 'params': scale,
+                            'seconds': seconds, 'peak_mb': peak_mb})
+            memory_text = f"{peak_mb:10.1f} MB" if memory else ""
+            print(f"{name:36} {scale_name:8} {seconds:10.4f} s {memory_text}", flush=True)
+    return {
+        'meta': {
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'machine': platform.machine(),
+            'cpus': os.cpu_count(),
+            'seed': SEED,
+            'repeat': repeat,
+        },
+        'results': results,
+    }
+
+# Compare two result files; returns the cases slower than `threshold` times the baseline
+def compare(baseline, current, threshold=1.2):
+    base = {(r['case'], r['scale']): r for r in baseline['results']}
+    regressions = []
+    for result in current['results']:
+        previous = base.get((result['case'], result['scale']))
+        if previous is None:
+            continue
+        ratio = result['seconds'] / previous['seconds']
+        flag = ' REGRESSION' if ratio > threshold else ''
+        memory_text = ''
+        if result['peak_mb'] is not None and previous['peak_mb'] is not None:
+            memory_text = f", {previous['peak_mb']:.1f} -> {result['peak_mb']:.1f} MB"
+        print(f"{result['case']:36} {result['scale']:8} {previous['seconds']:10.4f} s -> "
+              f"{result['seconds']:10.4f} s ({ratio:5.2f}x{memory_text}){flag}")
+        if flag:
+            regressions.append(result)
+    return regressions
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the generation, loading, training, inference and simulation hot paths.")
+    parser.add_argument('--scales', nargs='+', choices=list(SCALES), default=['small', 'medium'])
+    parser.add_argument('--only', nargs='+', help="Run only cases whose name contains one of these")
+    parser.add_argument('--repeat', type=int, default=1, help="Timed runs per case; the fastest is kept")
+    parser.add_argument('--no-memory', action='store_true', help="Skip the traced peak-memory run")
+    parser.add_argument('--output', default='benchmark_results.json')
+    parser.add_argument('--compare', metavar='BASELINE', help="Compare against an earlier results file")
+    parser.add_argument('--threshold', type=float, default=1.2, help="Slowdown ratio reported as a regression")
+    args = parser.parse_args()
+
+    current = run(args.scales, args.repeat, args.only, not args.no_memory)
+    with open(args.output, 'w') as f:
+        json.dump(current, f, indent=2)
+    print(f"Results saved to {args.output}.")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        if compare(baseline, current, args.threshold):
+            raise SystemExit(1)
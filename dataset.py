@@ -1,10 +1,28 @@
 import random
+import numpy as np
 import pandas as pd
-from datetime import datetime, timedelta
+
+import storage
 
 # Define the areas
 areas = ['Astraeon Basin', 'Helios Ridge', 'Elysium Crater']
 
+# Column ranges for the uniformly distributed attributes, in CSV column order
+FEATURE_RANGES = {
+    'Oxygen_Percentage': (10, 30),
+    'Soil_Quality': (0, 10),
+    'Water_Presence': (0, 100),
+    'UV_Radiation': (0, 10),  # mW/cm²
+    'Wind_Speed': (0, 10),  # m/s
+    'Soil_Nutrients': (0, 10),  # Nutrient value
+    'Pressure': (0, 10),  # Atmospheric pressure in arbitrary units
+    'Solar_Radiation': (0, 1500),  # W/m²
+    'Gravity': (0.5, 1.5),  # Gravitational force in g
+}
+
+# Sampling interval of the surface surveys
+INTERVAL_MINUTES = 30
+
 # Function to simulate temperature
 def simulate_temperature(time, area):
     """
@@ -20,49 +38,61 @@ def simulate_temperature(time, area):
     # Adding the base temperature and daily cycle fluctuation
     return base_temp + daily_cycle
 
+# Vectorized version of simulate_temperature for a whole column of readings
+def simulate_temperature_array(time_of_day, rng, dtype=np.float64):
+    """
+    Same diurnal model as simulate_temperature, but for an array of
+    times of day (in hours) drawn from a numpy Generator.
+    """
+    base_temp = rng.uniform(-10, 30, size=len(time_of_day)).astype(dtype, copy=False)
+    daily_cycle = 10 * (1 - np.abs(12 - time_of_day) / 12)
+    base_temp += daily_cycle.astype(dtype, copy=False)
+    return base_temp
+
+# Function to generate one area's survey as whole columns
+def generate_area_data(rows, rng=None, start=0, dtype=np.float64):
+    """
+    Generates `rows` half-hourly readings for a single area, starting at
+    interval number `start` after midnight of the first day.
+    """
+    if rng is None:
+        rng = np.random.default_rng()
+    minutes = (np.arange(start, start + rows, dtype=np.int64) * INTERVAL_MINUTES) % (24 * 60)
+    columns = {'Temperature': simulate_temperature_array(minutes / 60, rng, dtype)}
+    for name, (low, high) in FEATURE_RANGES.items():
+        columns[name] = rng.uniform(low, high, size=rows).astype(dtype, copy=False)
+    return pd.DataFrame(columns, copy=False)
+
+# Function to generate the datasets for many areas at once
+def generate_bulk_data(rows=48, seed=None, area_names=None, dtype=np.float64):
+    """
+    Returns a dict of area name -> DataFrame with `rows` readings each.
+    Every area gets its own child seed, so results are reproducible for
+    a given seed regardless of how many areas are requested.
+    """
+    if area_names is None:
+        area_names = areas
+    children = np.random.SeedSequence(seed).spawn(len(area_names))
+    return {
+        area: generate_area_data(rows, np.random.default_rng(child), dtype=dtype)
+        for area, child in zip(area_names, children)
+    }
+
 # Function to generate and save the dataset
-def generate_and_save_data():
-    # Starting time for the data collection (2025-01-01 00:00)
-    time_start = datetime(2025, 1, 1, 0, 0)
-    
-    # Loop through each area to generate data
-    for area in areas:
-        area_data = []
-        
-        # Collect data for 24 hours, every 30 minutes (48 intervals)
-        for i in range(48):  # 48 half-hour intervals in 24 hours
-            time = time_start + timedelta(minutes=i * 30)
-            
-            # Simulate various attributes for each time interval
-            temperature = simulate_temperature(time, area)
-            oxygen = random.uniform(10, 30)
-            soil_quality = random.uniform(0, 10)
-            water_presence = random.uniform(0, 100)
-            uv_radiation = random.uniform(0, 10)  # mW/cm²
-            wind_speed = random.uniform(0, 10)  # m/s
-            soil_nutrients = random.uniform(0, 10)  # Nutrient value
-            pressure = random.uniform(0, 10)  # Atmospheric pressure in arbitrary units
-            solar_radiation = random.uniform(0, 1500)  # W/m²
-            gravity = random.uniform(0.5, 1.5)  # Gravitational force in g
-            
-            # Add the data for the current time interval (without time column)
-            area_data.append({
-                'Temperature': temperature,
-                'Oxygen_Percentage': oxygen,
-                'Soil_Quality': soil_quality,
-                'Water_Presence': water_presence,
-                'UV_Radiation': uv_radiation,
-                'Wind_Speed': wind_speed,
-                'Soil_Nutrients': soil_nutrients,
-                'Pressure': pressure,
-                'Solar_Radiation': solar_radiation,
-                'Gravity': gravity
-            })
-        
-        # Convert the area data into a DataFrame and save it to CSV (without Time column)
-        df = pd.DataFrame(area_data)
-        df.to_csv(f'{area}_data.csv', index=False)
-        print(f"Data for {area} saved to CSV.")
+def generate_and_save_data(rows=48, seed=None, area_names=None, fmt='csv'):
+    # Collect data for 24 hours, every 30 minutes (48 intervals) by default
+    if area_names is None:
+        area_names = areas
+    # Same child seeds as generate_bulk_data, but one area is generated and
+    # saved at a time, so only one area's rows are ever in memory
+    children = np.random.SeedSequence(seed).spawn(len(area_names))
+
+    for area, child in zip(area_names, children):
+        df = generate_area_data(rows, np.random.default_rng(child))
+        # Save the area data (without Time column) in the requested format
+        path = storage.save_frame(df, area, fmt)
+        print(f"Data for {area} saved to {path}.")
+        del df
 
 # Run the program to generate and save the dataset
 if __name__ == "__main__":
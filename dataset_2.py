@@ -1,7 +1,10 @@
 import random
+import numpy as np
 import pandas as pd
 from datetime import datetime, timedelta
 
+import storage
+
 # Define possible parameters for both rovers
 crops = ['Wheat', 'Rice', 'Corn', 'Soybean', 'Potato']
 soil_conditions = ['Sandy', 'Clay', 'Loamy', 'Peaty', 'Saline']
@@ -49,8 +52,78 @@ def simulate_recycling_data(time):
         'Waste_Reduction': waste_reduction
     }
 
+# Vectorized version of simulate_farming_data for a block of timestamps
+def simulate_farming_chunk(times, rng):
+    n = len(times)
+    base_temp = rng.uniform(15, 35, size=n)
+    precipitation = rng.uniform(0, 100, size=n)
+    sunlight = rng.uniform(3, 12, size=n)
+    soil_quality = rng.uniform(3, 10, size=n)
+    crop_type = pd.Categorical.from_codes(rng.integers(0, len(crops), size=n), crops)
+    soil_condition = pd.Categorical.from_codes(rng.integers(0, len(soil_conditions), size=n), soil_conditions)
+    weather_condition = pd.Categorical.from_codes(rng.integers(0, len(weather_conditions), size=n), weather_conditions)
+
+    crop_health = 100 - np.abs(soil_quality - rng.uniform(3, 10, size=n)) * 5 - np.abs(base_temp - 25) * 2 + rng.uniform(0, 20, size=n)
+
+    return pd.DataFrame({
+        'Time': times,
+        'Temperature': base_temp,
+        'Precipitation': precipitation,
+        'Sunlight': sunlight,
+        'Soil_Quality': soil_quality,
+        'Crop_Type': crop_type,
+        'Soil_Condition': soil_condition,
+        'Weather_Condition': weather_condition,
+        'Crop_Health': crop_health
+    })
+
+# Vectorized version of simulate_recycling_data for a block of timestamps
+def simulate_recycling_chunk(times, rng):
+    n = len(times)
+    return pd.DataFrame({
+        'Time': times,
+        'Water_Quality': rng.uniform(30, 100, size=n),
+        'Nutrient_Levels': rng.uniform(0, 100, size=n),
+        'Oxygen_Content': rng.uniform(20, 100, size=n),
+        'Water_Level': rng.uniform(0, 100, size=n),
+        'Waste_Reduction': rng.uniform(0, 100, size=n)
+    })
+
+chunk_simulators = {
+    'Farming_Rover_Area': simulate_farming_chunk,
+    'Recycling_Rover_Area': simulate_recycling_chunk,
+}
+
+# Timestamps for intervals [start, stop) of a telemetry stream
+def interval_times(start, stop, interval, time_start=datetime(2025, 1, 1, 0, 0)):
+    offsets = np.arange(start, stop, dtype=np.int64) * np.timedelta64(interval)
+    return np.datetime64(time_start) + offsets
+
+# Function to stream both rovers' data to disk in fixed-size chunks
+def stream_and_save_data(days=365, interval=timedelta(hours=6), chunk_size=100_000, seed=None):
+    """
+    Writes the same telemetry as generate_and_save_data, but one chunk of
+    `chunk_size` rows at a time, so memory stays flat however many days or
+    how fine an interval is requested.
+    """
+    total = int(timedelta(days=days) / interval)
+    children = np.random.SeedSequence(seed).spawn(len(chunk_simulators))
+
+    for (area, simulate_chunk), child in zip(chunk_simulators.items(), children):
+        rng = np.random.default_rng(child)
+        path = f'{area}_data.csv'
+
+        for start in range(0, total, chunk_size):
+            stop = min(start + chunk_size, total)
+            df = simulate_chunk(interval_times(start, stop, interval), rng)
+            # First chunk truncates the file and writes the header, the rest append
+            df.to_csv(path, mode='w' if start == 0 else 'a', header=start == 0, index=False)
+            print(f"{area}: {stop}/{total} rows written", flush=True)
+
+        print(f"Data for {area} saved to CSV.")
+
 # Function to generate and save both rovers' data
-def generate_and_save_data():
+def generate_and_save_data(fmt='csv', days=365):
     # Define the areas and starting time
     areas = ['Farming_Rover_Area', 'Recycling_Rover_Area']
     time_start = datetime(2025, 1, 1, 0, 0)
@@ -59,8 +132,8 @@ def generate_and_save_data():
     for area in areas:
         area_data = []
         
-        # Loop through 365 days, collecting data every 6 hours (4 intervals per day)
-        for i in range(365 * 4):  # 365 days * 4 intervals per day
+        # Loop through the days (365 by default), collecting data every 6 hours (4 intervals per day)
+        for i in range(days * 4):  # days * 4 intervals per day
             time = time_start + timedelta(hours=i * 6)
             
             if area == 'Farming_Rover_Area':
@@ -73,10 +146,10 @@ def generate_and_save_data():
             # Add the data point for the current time interval
             area_data.append(data_point)
         
-        # Convert the data into a DataFrame and save it to CSV
+        # Convert the data into a DataFrame and save it in the requested format
         df = pd.DataFrame(area_data)
-        df.to_csv(f'{area}_data.csv', index=False)
-        print(f"Data for {area} saved to CSV.")
+        path = storage.save_frame(df, area, fmt)
+        print(f"Data for {area} saved to {path}.")
 
 # Run the program to generate and save both rovers' datasets
 if __name__ == "__main__":
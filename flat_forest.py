@@ -0,0 +1,147 @@
+import argparse
+import os
+
+import numpy as np
+
+# A fitted sklearn forest flattened into one set of contiguous node arrays.
+# Tree t's nodes sit at roots[t]..roots[t+1]-1 and child indices are global,
+# so every tree is walked at once with plain fancy indexing. Leaves point to
+# themselves, so walking max_depth steps from the roots always ends on a leaf.
+# Used for single rows, where sklearn's per-call validation and dispatch over
+# the estimators dominates; large batches are still faster through sklearn,
+# which training.predict_batch spreads over several cores.
+
+# Rows walked at a time in predict, to bound the (n_trees, rows) index arrays
+CHUNK_ROWS = 16_384
+
+class FlatForest:
+    def __init__(self, feature, threshold, children, missing_left, value, roots, max_depth, classes=None):
+        # Plain ndarrays, also when loaded memory-mapped, to keep indexing cheap
+        self.feature = np.asarray(feature)
+        self.threshold = np.asarray(threshold)
+        self.children = np.asarray(children)
+        self.missing_left = np.asarray(missing_left)
+        self.value = np.asarray(value)
+        self.roots = np.asarray(roots)
+        self.max_depth = int(max_depth)
+        self.classes_ = classes
+
+    # Unpickled by joblib with mmap_mode, which bypasses __init__
+    def __setstate__(self, state):
+        self.__init__(**state)
+
+    def __getstate__(self):
+        state = dict(self.__dict__)
+        state['classes'] = state.pop('classes_')
+        return state
+
+    @property
+    def n_trees(self):
+        return len(self.roots)
+
+    # Per-row leaf value averaged over the trees (class probabilities for classifiers)
+    def _mean_value(self, X):
+        # Same cast as sklearn, whose trees compare float32 features to float64 thresholds
+        X = np.ascontiguousarray(np.asarray(X, dtype=np.float32))
+        if X.ndim == 1:
+            X = X[None, :]
+        children = self.children.ravel()
+        out = np.empty((len(X),) + self.value.shape[1:])
+        for start in range(0, len(X), CHUNK_ROWS):
+            rows = X[start:start + CHUNK_ROWS]
+            n = len(rows)
+            values = rows.ravel()
+            offsets = np.arange(n) * rows.shape[1]
+            nodes = np.repeat(self.roots[:, None], n, axis=1)
+            has_missing = np.isnan(values).any()
+            for _ in range(self.max_depth):
+                x = values.take(offsets + self.feature.take(nodes))
+                go_right = x > self.threshold.take(nodes)
+                if has_missing:
+                    go_right |= np.isnan(x) & ~self.missing_left.take(nodes)
+                nodes = children.take(2 * nodes + go_right)
+            # Summed tree by tree, in order, then divided, as sklearn does
+            total = np.cumsum(self.value.take(nodes, axis=0), axis=0)[-1]
+            out[start:start + n] = total / self.n_trees
+        return out
+
+    def predict(self, X):
+        mean = self._mean_value(X)
+        if self.classes_ is not None:
+            return self.classes_.take(np.argmax(mean, axis=1), axis=0)
+        return mean[:, 0] if mean.shape[1] == 1 else mean
+
+    def predict_proba(self, X):
+        if self.classes_ is None:
+            raise AttributeError("predict_proba is only available for classifiers")
+        return self._mean_value(X)
+
+    def save(self, path):
+        arrays = dict(feature=self.feature, threshold=self.threshold, children=self.children,
+                      missing_left=self.missing_left, value=self.value, roots=self.roots,
+                      max_depth=self.max_depth)
+        if self.classes_ is not None:
+            arrays['classes'] = self.classes_
+        np.savez(path, **arrays)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path, allow_pickle=False) as f:
+            return cls(f['feature'], f['threshold'], f['children'], f['missing_left'], f['value'],
+                       f['roots'], f['max_depth'], f['classes'] if 'classes' in f else None)
+
+# Flatten a fitted RandomForestRegressor or single-output RandomForestClassifier
+def flatten(model):
+    trees = [estimator.tree_ for estimator in model.estimators_]
+    sizes = np.array([tree.node_count for tree in trees])
+    roots = np.concatenate([[0], np.cumsum(sizes)[:-1]]).astype(np.int32)
+    classifier = hasattr(model, 'classes_')
+    if classifier and model.n_outputs_ != 1:
+        raise ValueError("Only single-output classifiers can be flattened")
+
+    feature, threshold, children, missing_left, value = [], [], [], [], []
+    for tree, offset in zip(trees, roots):
+        leaf = tree.children_left == -1
+        own = np.arange(tree.node_count) + offset
+        feature.append(np.where(leaf, 0, tree.feature))
+        # Leaves compare feature 0 against +inf, so they always "go left" to themselves
+        threshold.append(np.where(leaf, np.inf, tree.threshold))
+        children.append(np.column_stack([np.where(leaf, own, tree.children_left + offset),
+                                         np.where(leaf, own, tree.children_right + offset)]))
+        # Where NaNs go at each split (trees fitted without NaNs send them right);
+        # leaves send them left, to themselves
+        nan_left = getattr(tree, 'missing_go_to_left', np.zeros(tree.node_count, dtype=bool))
+        missing_left.append(leaf | nan_left.astype(bool))
+        if classifier:
+            proba = tree.value[:, 0, :]
+            # Normalized per leaf, as DecisionTreeClassifier.predict_proba does
+            normalizer = proba.sum(axis=1)[:, None]
+            normalizer[normalizer == 0.0] = 1.0
+            value.append(proba / normalizer)
+        else:
+            value.append(tree.value[:, :, 0])
+
+    return FlatForest(
+        np.concatenate(feature).astype(np.int32),
+        np.concatenate(threshold),
+        np.concatenate(children).astype(np.int32),
+        np.concatenate(missing_left),
+        np.concatenate(value),
+        roots,
+        max(tree.max_depth for tree in trees),
+        model.classes_ if classifier else None,
+    )
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export the rover_2_3 models as flat forests.")
+    parser.add_argument('--output-dir', default='.')
+    args = parser.parse_args()
+
+    import rover_2_3
+
+    farming_model, recycling_model, _ = rover_2_3.load_or_train_models()
+    for name, model in (('farming', farming_model), ('recycling', recycling_model)):
+        path = os.path.join(args.output_dir, f'{name}_forest.npz')
+        flatten(model).save(path)
+        print(f"Saved {name} forest ({model.n_estimators} trees) to {path} "
+              f"({os.path.getsize(path) / 2**20:.1f} MB)")
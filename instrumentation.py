@@ -0,0 +1,88 @@
+import cProfile
+import io
+import pstats
+import sys
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+# resource is Unix-only; without it (on Windows) RSS is reported as None
+try:
+    import resource
+except ImportError:
+    resource = None
+
+# Start a run report; optionally with cProfile and tracemalloc capture
+def start_report(profile=False, trace_memory=False):
+    # Tracing someone else started (e.g. benchmark.measure_memory) is left running
+    started_tracing = trace_memory and not tracemalloc.is_tracing()
+    if started_tracing:
+        tracemalloc.start()
+    return {
+        'stages': [],
+        'started': time.perf_counter(),
+        'profiler': cProfile.Profile() if profile else None,
+        'trace_memory': trace_memory,
+        'started_tracing': started_tracing,
+    }
+
+# Peak resident set size of this process so far, in MB, or None where unavailable
+def max_rss_mb():
+    if resource is None:
+        return None
+    # ru_maxrss is in bytes on macOS and in KB elsewhere
+    unit = 2**20 if sys.platform == 'darwin' else 1024
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / unit
+
+# Record wall time, CPU time and memory of the code run inside the block
+@contextmanager
+def stage(report, name):
+    if report['trace_memory']:
+        tracemalloc.reset_peak()
+    if report['profiler'] is not None:
+        report['profiler'].enable()
+    wall, cpu, rss = time.perf_counter(), time.process_time(), max_rss_mb()
+    try:
+        yield
+    finally:
+        wall, cpu = time.perf_counter() - wall, time.process_time() - cpu
+        if report['profiler'] is not None:
+            report['profiler'].disable()
+        peak = max_rss_mb()
+        record = {
+            'stage': name,
+            'wall_seconds': wall,
+            'cpu_seconds': cpu,
+            # Peak RSS of the process so far, and how much this stage raised it
+            'max_rss_mb': peak,
+            'rss_growth_mb': None if peak is None else peak - rss,
+        }
+        if report['trace_memory']:
+            record['peak_traced_mb'] = tracemalloc.get_traced_memory()[1] / 2**20
+        report['stages'].append(record)
+
+# Turn a report into plain data (JSON-serializable), with the top profile entries
+def finish_report(report, profile_limit=25):
+    result = {
+        'stages': report['stages'],
+        'total_wall_seconds': time.perf_counter() - report['started'],
+    }
+    if report['profiler'] is not None:
+        out = io.StringIO()
+        pstats.Stats(report['profiler'], stream=out).sort_stats('cumulative').print_stats(profile_limit)
+        result['profile'] = out.getvalue()
+    if report['started_tracing']:
+        tracemalloc.stop()
+    return result
+
+def format_report(result):
+    lines = [f"{'Stage':12} {'Wall (s)':>10} {'CPU (s)':>10} {'Process peak RSS (MB)':>22} "
+             f"{'Peak growth (MB)':>17}"]
+    for record in result['stages']:
+        if record['max_rss_mb'] is None:
+            memory = f"{'n/a':>22} {'n/a':>17}"
+        else:
+            memory = f"{record['max_rss_mb']:22.1f} {record['rss_growth_mb']:17.1f}"
+        lines.append(f"{record['stage']:12} {record['wall_seconds']:10.3f} {record['cpu_seconds']:10.3f} {memory}")
+    lines.append(f"{'total':12} {result['total_wall_seconds']:10.3f}")
+    return '\n'.join(lines)
@@ -0,0 +1,46 @@
+import hashlib
+import json
+import os
+from importlib.metadata import version
+
+import pandas as pd
+
+CACHE_DIR = '.model_cache'
+
+# Hash of the training data, the hyperparameters and the sklearn version
+def fingerprint(frames, params):
+    digest = hashlib.sha256()
+    for df in frames:
+        digest.update(','.join(map(str, df.columns)).encode())
+        digest.update(pd.util.hash_pandas_object(df, index=False).to_numpy().tobytes())
+    digest.update(json.dumps(params, sort_keys=True, default=str).encode())
+    digest.update(version('scikit-learn').encode())
+    return digest.hexdigest()
+
+def _paths(name, cache_dir):
+    base = os.path.join(cache_dir, name)
+    return f'{base}.joblib', f'{base}.json'
+
+# Save trained models (and anything needed to use them) under `name`
+def save_models(name, key, payload, cache_dir=CACHE_DIR):
+    import joblib
+
+    os.makedirs(cache_dir, exist_ok=True)
+    model_path, meta_path = _paths(name, cache_dir)
+    # Uncompressed, so the numpy buffers inside can be memory-mapped on load
+    joblib.dump(payload, model_path)
+    with open(meta_path, 'w') as f:
+        json.dump({'fingerprint': key}, f)
+    return model_path
+
+# Load the models saved under `name`, or None if missing or the fingerprint differs
+def load_models(name, key, cache_dir=CACHE_DIR):
+    model_path, meta_path = _paths(name, cache_dir)
+    try:
+        with open(meta_path) as f:
+            if json.load(f)['fingerprint'] != key:
+                return None
+        import joblib
+        return joblib.load(model_path, mmap_mode='r')
+    except (OSError, ValueError, KeyError, EOFError):
+        return None
@@ -0,0 +1,112 @@
+import argparse
+from collections import deque
+
+import numpy as np
+import pandas as pd
+
+import storage
+import training
+
+ENCODED_COLUMNS = ['Crop_Type', 'Soil_Condition', 'Weather_Condition']
+
+# Extend the label encoders with categories first seen in this batch
+def update_encoders(label_encoders, batch):
+    for col in ENCODED_COLUMNS:
+        if col not in batch.columns:
+            continue
+        le = label_encoders.get(col)
+        if le is None:
+            from sklearn.preprocessing import LabelEncoder
+            le = label_encoders[col] = LabelEncoder()
+            le.classes_ = np.array([], dtype=object)
+        seen = set(le.classes_)
+        new = [value for value in pd.unique(batch[col].astype(str)) if value not in seen]
+        if new:
+            # Appended rather than re-sorted, so existing codes keep their meaning
+            le.classes_ = np.concatenate([le.classes_.astype(object), np.array(sorted(new), dtype=object)])
+    return label_encoders
+
+# Encode a batch with the (possibly extended) label encoders
+def encode_batch(label_encoders, batch):
+    batch = batch.drop(columns=['Time'], errors='ignore')
+    for col in ENCODED_COLUMNS:
+        if col in batch.columns:
+            mapping = {value: code for code, value in enumerate(label_encoders[col].classes_)}
+            batch[col] = batch[col].astype(str).map(mapping).astype(np.int64)
+    return batch
+
+# State of an incrementally trained model
+def start_online_model(target, model=None, label_encoders=None, trees_per_batch=10,
+                       max_trees=200, window=20, seed=42):
+    """
+    Returns a dict holding the model, its label encoders and a rolling
+    window of holdout scores. `model` may be an already trained forest
+    (e.g. from rover_2_3.load_or_train_models) to continue from.
+    `seed` starts the generator that seeds each batch's new trees.
+    """
+    return {
+        'target': target,
+        'model': model,
+        'label_encoders': label_encoders if label_encoders is not None else {},
+        'trees_per_batch': trees_per_batch,
+        'max_trees': max_trees,
+        'scores': deque(maxlen=window),
+        'rng': np.random.default_rng(seed),
+        'rows_seen': 0,
+    }
+
+# Ingest one micro-batch of telemetry rows
+def update_online_model(state, batch):
+    """
+    Scores the current model on the batch before learning from it, so
+    every score is on rows the model has not seen, then fits
+    `trees_per_batch` new trees on the batch alone. The oldest trees are
+    dropped beyond `max_trees`, so cost per batch stays constant.
+    """
+    update_encoders(state['label_encoders'], batch)
+    batch = encode_batch(state['label_encoders'], batch)
+    X = batch.drop(columns=[state['target']])
+    y = batch[state['target']]
+
+    model = state['model']
+    if model is None:
+        from sklearn.ensemble import RandomForestRegressor
+        model = training.build_forest(RandomForestRegressor, n_estimators=state['trees_per_batch'],
+                                      warm_start=True)
+        training.fit_forest(model, X, y)
+    else:
+        predictions = model.predict(X)
+        state['scores'].append(float(np.mean(np.abs(predictions - y.to_numpy()))))
+        # A fresh seed per batch; once the forest is trimmed to max_trees its
+        # size stops changing, and sklearn would otherwise reuse the same seeds
+        seed = int(state['rng'].integers(np.iinfo(np.int32).max))
+        training.grow_forest(model, X, y, state['trees_per_batch'], random_state=seed)
+        if len(model.estimators_) > state['max_trees']:
+            model.estimators_ = model.estimators_[-state['max_trees']:]
+            model.n_estimators = state['max_trees']
+
+    state['model'] = model
+    state['rows_seen'] += len(batch)
+    return state
+
+# Mean absolute error over the rolling window of holdout batches
+def rolling_score(state):
+    return float(np.mean(state['scores'])) if state['scores'] else None
+
+# Replay a telemetry file in micro-batches
+def iter_batches(name, batch_size):
+    yield from pd.read_csv(storage.data_path(name), chunksize=batch_size)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Train a rover model incrementally from telemetry micro-batches.")
+    parser.add_argument('area', choices=['Farming_Rover_Area', 'Recycling_Rover_Area'])
+    parser.add_argument('--batch-size', type=int, default=100)
+    args = parser.parse_args()
+
+    target = 'Crop_Health' if args.area == 'Farming_Rover_Area' else 'Waste_Reduction'
+    state = start_online_model(target)
+    for batch in iter_batches(args.area, args.batch_size):
+        update_online_model(state, batch)
+        score = rolling_score(state)
+        if score is not None:
+            print(f"{state['rows_seen']} rows: rolling holdout MAE {score:.2f}")
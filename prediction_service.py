@@ -0,0 +1,185 @@
+import argparse
+import asyncio
+import json
+import time
+from collections import deque
+
+import numpy as np
+
+import rover_2_3
+
+# Protocol: one JSON object per line over a local TCP socket.
+#   {"farming": {...FARMING_FEATURES...}, "recycling": {...RECYCLING_FEATURES...}}
+#     -> {"farming": <crop health>, "recycling": <waste reduction>}
+#   {"stats": true} -> latency percentiles and throughput
+# Requests arriving within the latency budget share one batched predict.
+
+# Micro-batching predictor around the farming and recycling models
+class PredictionService:
+    def __init__(self, farming_model, recycling_model, max_batch=1024, max_delay=0.005, window=10_000):
+        self.farming_model = farming_model
+        self.recycling_model = recycling_model
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self.queue = None
+        self.latencies = deque(maxlen=window)
+        self.completed = 0
+        self.failed = 0
+        self.batches = 0
+        self.batched_rows = 0
+        self.started = time.perf_counter()
+
+    async def start(self):
+        self.queue = asyncio.Queue()
+        self._worker = asyncio.create_task(self._run())
+
+    # Queue one request and wait for its prediction
+    async def predict(self, farming_conditions, recycling_conditions):
+        # Rejected here, so one bad row cannot fail the batch it would join
+        try:
+            farming_row = [float(farming_conditions[name]) for name in rover_2_3.FARMING_FEATURES]
+            recycling_row = [float(recycling_conditions[name]) for name in rover_2_3.RECYCLING_FEATURES]
+            if not np.isfinite(farming_row + recycling_row).all():
+                raise ValueError("Conditions must be finite numbers")
+        except (KeyError, TypeError, ValueError):
+            self.failed += 1
+            raise
+        future = asyncio.get_running_loop().create_future()
+        await self.queue.put((time.perf_counter(), farming_row, recycling_row, future))
+        return await future
+
+    async def _next_batch(self):
+        batch = [await self.queue.get()]
+        deadline = batch[0][0] + self.max_delay
+        while len(batch) < self.max_batch:
+            # Take everything already queued, then wait for more only
+            # while the oldest request's latency budget lasts
+            if not self.queue.empty():
+                batch.append(self.queue.get_nowait())
+                continue
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self.queue.get(), remaining))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = await self._next_batch()
+            farming = np.array([request[1] for request in batch])
+            recycling = np.array([request[2] for request in batch])
+            try:
+                # Off the event loop, so new requests keep queueing during predict
+                outputs = await loop.run_in_executor(
+                    None, rover_2_3.make_predictions_batch,
+                    self.farming_model, self.recycling_model, farming, recycling)
+                results = list(zip(*outputs))
+            except Exception:
+                # Retry row by row, so only the requests that fail get the error
+                results = await loop.run_in_executor(None, self._predict_rows, farming, recycling)
+
+            finished = time.perf_counter()
+            for (received, _, _, future), result in zip(batch, results):
+                if isinstance(result, Exception):
+                    self.failed += 1
+                    if not future.done():
+                        future.set_exception(result)
+                else:
+                    self.completed += 1
+                    if not future.done():
+                        future.set_result((float(result[0]), float(result[1])))
+                self.latencies.append(finished - received)
+            self.batches += 1
+            self.batched_rows += len(batch)
+
+    # Predict each row on its own, returning the exception in place of a failed row's outputs
+    def _predict_rows(self, farming, recycling):
+        results = []
+        for farming_row, recycling_row in zip(farming, recycling):
+            try:
+                f_out, r_out = rover_2_3.make_predictions_batch(
+                    self.farming_model, self.recycling_model, farming_row[None, :], recycling_row[None, :])
+                results.append((f_out[0], r_out[0]))
+            except Exception as e:
+                results.append(e)
+        return results
+
+    # Latency percentiles over the recent window (failed requests included) and overall throughput
+    def stats(self):
+        latencies = np.array(self.latencies) * 1000
+        elapsed = time.perf_counter() - self.started
+        return {
+            'requests': self.completed,
+            'failed': self.failed,
+            'batches': self.batches,
+            'mean_batch_size': self.batched_rows / self.batches if self.batches else 0.0,
+            'p50_ms': float(np.percentile(latencies, 50)) if len(latencies) else None,
+            'p99_ms': float(np.percentile(latencies, 99)) if len(latencies) else None,
+            'throughput_per_s': self.completed / elapsed if elapsed > 0 else 0.0,
+        }
+
+    # Serve one client connection, answering each line as it completes
+    async def handle_client(self, reader, writer):
+        pending = set()
+        lock = asyncio.Lock()
+
+        async def respond(line):
+            request = {}
+            conditions = None
+            try:
+                request = json.loads(line)
+                if request.get('stats'):
+                    response = self.stats()
+                else:
+                    conditions = request['farming'], request['recycling']
+                    farming_output, recycling_output = await self.predict(*conditions)
+                    response = {'farming': farming_output, 'recycling': recycling_output}
+            except (ValueError, KeyError, TypeError, AttributeError) as e:
+                # predict counts its own failures; malformed requests never reach it
+                if conditions is None:
+                    self.failed += 1
+                response = {'error': f"{type(e).__name__}: {e}"}
+            if isinstance(request, dict) and 'id' in request:
+                response['id'] = request['id']
+            async with lock:
+                try:
+                    writer.write((json.dumps(response) + '\n').encode())
+                    await writer.drain()
+                except ConnectionError:
+                    pass  # The client went away; nothing is left to answer
+
+        try:
+            while line := await reader.readline():
+                # Each line is handled concurrently, so one client can pipeline requests
+                task = asyncio.create_task(respond(line))
+                pending.add(task)
+                task.add_done_callback(pending.discard)
+        except ConnectionError:
+            pass
+        finally:
+            if pending:
+                await asyncio.gather(*pending)
+            writer.close()
+
+async def serve(host='127.0.0.1', port=8765, max_batch=1024, max_delay=0.005):
+    # Models are loaded once, from the model cache when the data is unchanged
+    farming_model, recycling_model, _ = rover_2_3.load_or_train_models()
+    service = PredictionService(farming_model, recycling_model, max_batch, max_delay)
+    await service.start()
+    server = await asyncio.start_server(service.handle_client, host, port)
+    print(f"Serving rover predictions on {host}:{port}", flush=True)
+    async with server:
+        await server.serve_forever()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve farming/recycling predictions over a local socket.")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--max-batch', type=int, default=1024)
+    parser.add_argument('--max-delay-ms', type=float, default=5, help="Latency budget for filling a batch")
+    args = parser.parse_args()
+    asyncio.run(serve(args.host, args.port, args.max_batch, args.max_delay_ms / 1000))
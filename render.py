@@ -0,0 +1,198 @@
+import argparse
+import ast
+import glob
+import hashlib
+import importlib
+import importlib.util
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+# Headless rendering: always the non-interactive backend, here and in the workers
+import matplotlib
+matplotlib.use('Agg')
+
+RENDER_DIR = 'renders'
+
+# Figure name -> (module, plotting function). Every function takes show=False
+# and returns either a Figure or a (Figure, Animation) pair.
+FIGURES = {
+    'warp_bubble': ('warp', 'visualize_warp_bubble'),
+    'journey_animation': ('warp', 'animate_journey'),
+    'energy_vs_warp': ('warp', 'plot_energy_vs_warp'),
+    'travel_time_vs_warp': ('warp', 'plot_travel_time_vs_warp'),
+    'resource_depletion': ('warp', 'plot_resource_depletion'),
+    'trajectory_2d': ('warp', 'plot_trajectory_2d'),
+    'obstacle_frequency': ('warp', 'plot_obstacle_frequency'),
+    'feature_importance': ('Rover_1', 'plot_feature_importance'),
+    'rover_predictions': ('animated', 'create_animation'),
+}
+
+# Datasets a figure is drawn from (through the models trained on them);
+# None stands for the surface areas Rover_1 finds
+FIGURE_DATASETS = {
+    'feature_importance': None,
+    'rover_predictions': ['Farming_Rover_Area', 'Recycling_Rover_Area'],
+}
+
+PROJECT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Source files of a project module and of every project module it imports,
+# including the ones imported inside functions
+def project_sources(module, seen=None):
+    seen = set() if seen is None else seen
+    spec = importlib.util.find_spec(module)
+    if spec is None or spec.origin is None or os.path.dirname(spec.origin) != PROJECT_DIR:
+        return seen
+    if spec.origin in seen:
+        return seen
+    seen.add(spec.origin)
+    with open(spec.origin, 'rb') as f:
+        tree = ast.parse(f.read())
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            names = [alias.name for alias in node.names]
+        elif isinstance(node, ast.ImportFrom) and node.module and not node.level:
+            names = [node.module]
+        else:
+            continue
+        for imported in names:
+            project_sources(imported.split('.')[0], seen)
+    return seen
+
+# Files a dataset is read from: its CSV when there is one, else its binary copy
+def dataset_files(name):
+    import storage
+
+    for fmt in storage.FORMATS:
+        path = storage.data_path(name, fmt)
+        if os.path.isdir(path):
+            return sorted(glob.glob(os.path.join(glob.escape(path), '*')))
+        if os.path.exists(path):
+            return [path]
+    return []
+
+def figure_datasets(name):
+    if FIGURE_DATASETS[name] is None:
+        import Rover_1
+        return Rover_1.discover_areas()
+    return FIGURE_DATASETS[name]
+
+# Cache key from the figure name, its arguments, the sources of the project
+# modules drawing it and the data (and tuned hyperparameters) behind it
+def figure_key(name, kwargs):
+    import training
+
+    module, _ = FIGURES[name]
+    digest = hashlib.sha256(json.dumps([name, kwargs], sort_keys=True).encode())
+    paths = sorted(project_sources(module))
+    if name in FIGURE_DATASETS:
+        paths += [path for dataset in figure_datasets(name) for path in dataset_files(dataset)]
+        paths.append(training.TUNED_PARAMS_PATH)
+    for path in paths:
+        digest.update(path.encode())
+        if os.path.exists(path):
+            with open(path, 'rb') as f:
+                digest.update(f.read())
+    return digest.hexdigest()[:16]
+
+def cached_path(name, kwargs, out_dir=RENDER_DIR):
+    matches = glob.glob(os.path.join(glob.escape(out_dir), f'{name}_{figure_key(name, kwargs)}.*'))
+    return matches[0] if matches else None
+
+# Feature importances of the Rover_1 forest trained on the surface areas
+def rover_feature_importances():
+    import Rover_1
+    model = Rover_1.train_model(Rover_1.load_data())
+    return {'feature_importances': model.feature_importances_.tolist()}
+
+# Arguments computed only when a figure is rendered, since they are costly;
+# the figure's datasets stand in for them in its cache key
+COMPUTED_ARGUMENTS = {
+    'feature_importance': rover_feature_importances,
+}
+
+# Render one figure to PNG, or an animation to MP4 (GIF without ffmpeg)
+def render_figure(name, kwargs, out_dir=RENDER_DIR):
+    import matplotlib.pyplot as plt
+    from matplotlib.animation import writers
+
+    module, function = FIGURES[name]
+    arguments = {**kwargs, **COMPUTED_ARGUMENTS[name]()} if name in COMPUTED_ARGUMENTS else kwargs
+    figure = getattr(importlib.import_module(module), function)(**arguments, show=False)
+    base = f'{name}_{figure_key(name, kwargs)}'
+
+    if isinstance(figure, tuple):
+        figure, animation = figure
+        writer = 'ffmpeg' if writers.is_available('ffmpeg') else 'pillow'
+        extension = '.mp4' if writer == 'ffmpeg' else '.gif'
+        save = lambda path: animation.save(path, writer=writer)
+    else:
+        extension = '.png'
+        save = figure.savefig
+    # Saved under a hidden name first, so an interrupted or failed save never
+    # leaves a file that cached_path would match
+    path = os.path.join(out_dir, base + extension)
+    partial = os.path.join(out_dir, f'.{base}.{os.getpid()}{extension}')
+    try:
+        save(partial)
+        os.replace(partial, path)
+    finally:
+        if os.path.exists(partial):
+            os.remove(partial)
+        plt.close(figure)
+    return path
+
+def _render_job(args):
+    return render_figure(*args)
+
+# Render a list of (name, kwargs) jobs in worker processes, skipping cached ones
+def render_all(jobs, out_dir=RENDER_DIR, workers=None):
+    os.makedirs(out_dir, exist_ok=True)
+    paths = [cached_path(name, kwargs, out_dir) for name, kwargs in jobs]
+    pending = [i for i, path in enumerate(paths) if path is None]
+
+    if pending:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            rendered = pool.map(_render_job, [(*jobs[i], out_dir) for i in pending])
+            for i, path in zip(pending, rendered):
+                paths[i] = path
+    return paths
+
+# The figures warp.main shows, as render jobs
+def warp_report_jobs(warp_factor, initial_population, resources, seed=0):
+    return [
+        ('warp_bubble', {}),
+        ('journey_animation', {'warp_factor': warp_factor}),
+        ('energy_vs_warp', {}),
+        ('travel_time_vs_warp', {}),
+        ('resource_depletion', {'initial_population': initial_population, 'resources': resources}),
+        ('trajectory_2d', {'warp_factor': warp_factor}),
+        ('obstacle_frequency', {'seed': seed}),
+    ]
+
+# The figures of the rover analyses, as render jobs
+def rover_report_jobs():
+    return [
+        ('feature_importance', {}),
+        # Seeded, so the cached animation is the one this key would render
+        ('rover_predictions', {'seed': 0}),
+    ]
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Render the project's figures to files without a display.")
+    parser.add_argument('report', choices=['warp', 'rover'])
+    parser.add_argument('--warp-factor', type=float, default=5)
+    parser.add_argument('--population', type=int, default=10)
+    parser.add_argument('--resources', type=float, default=100000)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--out-dir', default=RENDER_DIR)
+    parser.add_argument('--workers', type=int)
+    args = parser.parse_args()
+
+    if args.report == 'warp':
+        jobs = warp_report_jobs(args.warp_factor, args.population, args.resources, args.seed)
+    else:
+        jobs = rover_report_jobs()
+    for path in render_all(jobs, args.out_dir, args.workers):
+        print(f"Rendered {path}")
@@ -1,56 +1,163 @@
+import numpy as np
 import pandas as pd
 import random
-from sklearn.ensemble import RandomForestRegressor
-from sklearn.model_selection import train_test_split
-from sklearn.preprocessing import LabelEncoder
 from datetime import datetime, timedelta
 
-# Load datasets
-def load_data():
-    farming_data = pd.read_csv("Farming_Rover_Area_data.csv")
-    recycling_data = pd.read_csv("Recycling_Rover_Area_data.csv")
+import model_registry
+import storage
+import training
+
+# sklearn is imported inside the preprocessing and training functions, so
+# callers that only need conditions or cached models do not load it.
+
+# Columns the models use, in file order (the 'Time' column is not needed)
+FARMING_COLUMNS = ['Temperature', 'Precipitation', 'Sunlight', 'Soil_Quality',
+                   'Crop_Type', 'Soil_Condition', 'Weather_Condition', 'Crop_Health']
+RECYCLING_COLUMNS = ['Water_Quality', 'Nutrient_Levels', 'Oxygen_Content', 'Water_Level',
+                     'Waste_Reduction']
+
+FARMING_FEATURES = FARMING_COLUMNS[:-1]
+RECYCLING_FEATURES = RECYCLING_COLUMNS[:-1]
+
+# Hyperparameters shared by both regressors
+MODEL_PARAMS = dict(training.FOREST_PARAMS)
+
+# Hyperparameters of one model ('farming' or 'recycling'), with any tuned by tuning.py
+def model_params(name):
+    return {**MODEL_PARAMS, **training.tuned_params(name)}
+
+# Load datasets; 'Time' is only read when window features will be computed from it
+def load_data(with_time=False):
+    time_column = ['Time'] if with_time else []
+    farming_data = storage.load_frame("Farming_Rover_Area", columns=time_column + FARMING_COLUMNS)
+    recycling_data = storage.load_frame("Recycling_Rover_Area", columns=time_column + RECYCLING_COLUMNS)
     return farming_data, recycling_data
 
+# Append rolling means, variances and lags of an area's telemetry as extra feature columns
+def add_window_features(data, area):
+    import telemetry_features
+
+    features = telemetry_features.window_features(data, telemetry_features.FEATURE_COLUMNS[area])
+    return pd.concat([data, features], axis=1)
+
 # Preprocess farming data
 def preprocess_farming_data(farming_data):
+    from sklearn.preprocessing import LabelEncoder
+
     label_encoders = {}
     for col in ['Crop_Type', 'Soil_Condition', 'Weather_Condition']:
         le = LabelEncoder()
         farming_data[col] = le.fit_transform(farming_data[col])
         label_encoders[col] = le
 
-    # Drop the 'Time' column as it is not numerical
-    farming_data = farming_data.drop(columns=['Time'])
+    # Drop the 'Time' column (if loaded) as it is not numerical
+    farming_data = farming_data.drop(columns=['Time'], errors='ignore')
     return farming_data, label_encoders
 
 # Preprocess recycling data
 def preprocess_recycling_data(recycling_data):
-    # Drop the 'Time' column as it is not numerical
-    recycling_data = recycling_data.drop(columns=['Time'])
+    # Drop the 'Time' column (if loaded) as it is not numerical
+    recycling_data = recycling_data.drop(columns=['Time'], errors='ignore')
     return recycling_data
 
 # Train a model for farming rover
-def train_farming_model(farming_data):
+def train_farming_model(farming_data, n_jobs=None):
+    from sklearn.ensemble import RandomForestRegressor
+
     X = farming_data.drop(columns=["Crop_Health"])
     y = farming_data["Crop_Health"]
 
-    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
+    X_train, X_test, y_train, y_test = training.split_rows(X, y)
 
-    model = RandomForestRegressor(n_estimators=100, random_state=42)
-    model.fit(X_train, y_train)
+    model = training.build_forest(RandomForestRegressor, n_jobs, **model_params("farming"))
+    training.fit_forest(model, X_train, y_train)
     return model
 
 # Train a model for recycling rover
-def train_recycling_model(recycling_data):
+def train_recycling_model(recycling_data, n_jobs=None):
+    from sklearn.ensemble import RandomForestRegressor
+
     X = recycling_data.drop(columns=["Waste_Reduction"])
     y = recycling_data["Waste_Reduction"]
 
-    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
+    X_train, X_test, y_train, y_test = training.split_rows(X, y)
 
-    model = RandomForestRegressor(n_estimators=100, random_state=42)
-    model.fit(X_train, y_train)
+    model = training.build_forest(RandomForestRegressor, n_jobs, **model_params("recycling"))
+    training.fit_forest(model, X_train, y_train)
     return model
 
+# Load both models from the registry, retraining only when the data or settings changed
+def load_or_train_models(use_cache=True, flat=False, windows=False):
+    """
+    With `flat=True` the models are returned as flat_forest.FlatForest,
+    which gives the same predictions with much less per-call overhead
+    for single rows (make_predictions, the animated.py frame loop).
+    With `windows=True` they are trained with the telemetry_features
+    window features as extra inputs; predict with conditions extended
+    by telemetry_features.live_window_features.
+    """
+    farming_data, recycling_data = load_data(with_time=windows)
+    params = {"farming": model_params("farming"), "recycling": model_params("recycling")}
+    if windows:
+        import telemetry_features
+        params["windows"] = list(telemetry_features.WINDOWS)
+    key = model_registry.fingerprint([farming_data, recycling_data], params)
+    name = "rover_2_3" + ("_windows" if windows else "") + ("_flat" if flat else "")
+    if use_cache:
+        cached = model_registry.load_models(name, key)
+        if cached is not None:
+            return cached["farming_model"], cached["recycling_model"], cached["label_encoders"]
+
+    if flat:
+        import flat_forest
+
+        farming_model, recycling_model, label_encoders = load_or_train_models(use_cache, windows=windows)
+        farming_model, recycling_model = flat_forest.flatten(farming_model), flat_forest.flatten(recycling_model)
+        model_registry.save_models(name, key, {
+            "farming_model": farming_model,
+            "recycling_model": recycling_model,
+            "label_encoders": label_encoders,
+        })
+        return farming_model, recycling_model, label_encoders
+
+    if windows:
+        farming_data = add_window_features(farming_data, "Farming_Rover_Area")
+        recycling_data = add_window_features(recycling_data, "Recycling_Rover_Area")
+    farming_data, label_encoders = preprocess_farming_data(farming_data)
+    recycling_data = preprocess_recycling_data(recycling_data)
+    # The two models are independent, so fit them side by side
+    farming_model, recycling_model = training.fit_concurrently([
+        lambda n_jobs: train_farming_model(farming_data, n_jobs),
+        lambda n_jobs: train_recycling_model(recycling_data, n_jobs),
+    ])
+
+    model_registry.save_models(name, key, {
+        "farming_model": farming_model,
+        "recycling_model": recycling_model,
+        "label_encoders": label_encoders,
+    })
+    return farming_model, recycling_model, label_encoders
+
+# Window states primed with the telemetry history, for live predictions with windows=True models
+def start_live_windows():
+    import telemetry_features
+
+    states = {}
+    for area, data in zip(["Farming_Rover_Area", "Recycling_Rover_Area"], load_data(with_time=True)):
+        states[area] = telemetry_features.start_window_state(telemetry_features.FEATURE_COLUMNS[area])
+        telemetry_features.update_window_features(states[area], data)
+    return states
+
+# Extend the conditions of a reading taken at `time` with their window features
+def live_conditions(states, time, farming_conditions, recycling_conditions):
+    from telemetry_features import live_window_features
+
+    farming_conditions = {**farming_conditions,
+                          **live_window_features(states["Farming_Rover_Area"], time, farming_conditions)}
+    recycling_conditions = {**recycling_conditions,
+                            **live_window_features(states["Recycling_Rover_Area"], time, recycling_conditions)}
+    return farming_conditions, recycling_conditions
+
 # Generate random conditions for farming and recycling rovers
 def generate_random_conditions():
     farming_conditions = {
@@ -70,6 +177,42 @@ def generate_random_conditions():
     }
     return farming_conditions, recycling_conditions
 
+# Generate n random condition vectors at once, columns in FARMING_FEATURES / RECYCLING_FEATURES order
+def generate_random_conditions_batch(n, rng=None):
+    if rng is None:
+        rng = np.random.default_rng()
+    farming_conditions = np.column_stack([
+        rng.uniform(15, 35, size=n),  # Temperature
+        rng.uniform(0, 100, size=n),  # Precipitation
+        rng.uniform(3, 12, size=n),  # Sunlight
+        rng.uniform(3, 10, size=n),  # Soil_Quality
+        rng.integers(0, 5, size=(n, 3)),  # Encoded Crop_Type, Soil_Condition, Weather_Condition
+    ])
+    recycling_conditions = np.column_stack([
+        rng.uniform(30, 100, size=n),  # Water_Quality
+        rng.uniform(0, 100, size=n),  # Nutrient_Levels
+        rng.uniform(20, 100, size=n),  # Oxygen_Content
+        rng.uniform(0, 100, size=n),  # Water_Level
+    ])
+    return farming_conditions, recycling_conditions
+
+# Make predictions for N condition vectors in one call per model
+def make_predictions_batch(farming_model, recycling_model, farming_conditions, recycling_conditions):
+    """
+    Takes (N, 7) and (N, 4) arrays laid out as FARMING_FEATURES and
+    RECYCLING_FEATURES and returns two length-N arrays of predictions.
+    """
+    # One zero-copy frame per batch keeps the feature names the models were fitted with
+    farming_input = pd.DataFrame(np.asarray(farming_conditions, dtype=np.float64),
+                                 columns=FARMING_FEATURES, copy=False)
+    recycling_input = pd.DataFrame(np.asarray(recycling_conditions, dtype=np.float64),
+                                   columns=RECYCLING_FEATURES, copy=False)
+
+    farming_output = training.predict_batch(farming_model, farming_input)
+    recycling_output = training.predict_batch(recycling_model, recycling_input)
+
+    return farming_output, recycling_output
+
 # Make predictions
 def make_predictions(farming_model, recycling_model, farming_conditions, recycling_conditions):
     farming_input = pd.DataFrame([farming_conditions])
@@ -82,16 +225,8 @@ def make_predictions(farming_model, recycling_model, farming_conditions, recycli
 
 # Main program
 def main():
-    # Load data
-    farming_data, recycling_data = load_data()
-
-    # Preprocess data
-    farming_data, label_encoders = preprocess_farming_data(farming_data)
-    recycling_data = preprocess_recycling_data(recycling_data)
-
-    # Train models
-    farming_model = train_farming_model(farming_data)
-    recycling_model = train_recycling_model(recycling_data)
+    # Load cached models, or load, preprocess and train them
+    farming_model, recycling_model, label_encoders = load_or_train_models()
 
     # Generate random conditions
     farming_conditions, recycling_conditions = generate_random_conditions()
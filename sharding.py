@@ -0,0 +1,116 @@
+import argparse
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from datetime import timedelta
+
+import numpy as np
+
+import dataset
+import dataset_2
+
+MANIFEST_NAME = 'manifest.json'
+
+# Split every area's rows into shards of at most `rows_per_shard` rows
+def plan_shards(area_names, rows, rows_per_shard):
+    shards = []
+    for area in area_names:
+        for start in range(0, rows, rows_per_shard):
+            shards.append({
+                'index': len(shards),
+                'area': area,
+                'start': start,
+                'rows': min(rows_per_shard, rows - start),
+            })
+    return shards
+
+# Each shard draws from its own child of the root seed, so any shard can be
+# regenerated on its own without replaying the ones before it
+def shard_rng(seed, index):
+    return np.random.default_rng(np.random.SeedSequence(seed, spawn_key=(index,)))
+
+def shard_path(out_dir, shard):
+    return os.path.join(out_dir, f"{shard['area']}_data.{shard['index']:05d}.csv")
+
+# Generate and write a single shard described by the manifest fields
+def generate_shard(kind, shard, seed, out_dir, interval_seconds=None):
+    rng = shard_rng(seed, shard['index'])
+    if kind == 'surface':
+        df = dataset.generate_area_data(shard['rows'], rng, start=shard['start'])
+    elif kind == 'telemetry':
+        times = dataset_2.interval_times(shard['start'], shard['start'] + shard['rows'],
+                                         timedelta(seconds=interval_seconds))
+        df = dataset_2.chunk_simulators[shard['area']](times, rng)
+    else:
+        raise ValueError(f"Unknown dataset kind: {kind}")
+
+    path = shard_path(out_dir, shard)
+    df.to_csv(path, index=False)
+    return path
+
+def _generate_shard_job(args):
+    return generate_shard(*args)
+
+# Generate a whole dataset as numbered shard files plus a manifest
+def generate_sharded(kind, rows, rows_per_shard, out_dir, seed=None, area_names=None,
+                     interval=timedelta(hours=6), workers=None):
+    """
+    `kind` is 'surface' (the dataset.py areas) or 'telemetry' (the
+    dataset_2.py rover areas). Shards are spread over a process pool and
+    written to `out_dir` together with a manifest recording the root seed
+    and each shard's area and row range.
+    """
+    if area_names is None:
+        area_names = dataset.areas if kind == 'surface' else list(dataset_2.chunk_simulators)
+    if seed is None:
+        seed = np.random.SeedSequence().entropy
+    interval_seconds = interval.total_seconds() if kind == 'telemetry' else None
+
+    os.makedirs(out_dir, exist_ok=True)
+    shards = plan_shards(area_names, rows, rows_per_shard)
+    jobs = [(kind, shard, seed, out_dir, interval_seconds) for shard in shards]
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for shard, path in zip(shards, pool.map(_generate_shard_job, jobs)):
+            shard['file'] = os.path.basename(path)
+            print(f"Shard {shard['index']} ({shard['area']}) saved to {path}.")
+
+    manifest = {
+        'kind': kind,
+        'seed': seed,
+        'rows': rows,
+        'rows_per_shard': rows_per_shard,
+        'interval_seconds': interval_seconds,
+        'shards': shards,
+    }
+    manifest_path = os.path.join(out_dir, MANIFEST_NAME)
+    with open(manifest_path, 'w') as f:
+        json.dump(manifest, f, indent=2)
+    return manifest_path
+
+# Regenerate one shard exactly as recorded in a manifest
+def regenerate_shard(manifest_path, index):
+    with open(manifest_path) as f:
+        manifest = json.load(f)
+    out_dir = os.path.dirname(manifest_path)
+    return generate_shard(manifest['kind'], manifest['shards'][index], manifest['seed'],
+                          out_dir, manifest['interval_seconds'])
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate a sharded synthetic survey in parallel.")
+    parser.add_argument('kind', choices=['surface', 'telemetry'])
+    parser.add_argument('out_dir')
+    parser.add_argument('--rows', type=int, default=48)
+    parser.add_argument('--rows-per-shard', type=int, default=1_000_000)
+    parser.add_argument('--seed', type=int)
+    parser.add_argument('--interval-hours', type=float, default=6)
+    parser.add_argument('--workers', type=int)
+    parser.add_argument('--regenerate', type=int, metavar='INDEX',
+                        help="Regenerate a single shard from out_dir's manifest")
+    args = parser.parse_args()
+
+    if args.regenerate is not None:
+        print(regenerate_shard(os.path.join(args.out_dir, MANIFEST_NAME), args.regenerate))
+    else:
+        generate_sharded(args.kind, args.rows, args.rows_per_shard, args.out_dir, args.seed,
+                         interval=timedelta(hours=args.interval_hours), workers=args.workers)
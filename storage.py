@@ -0,0 +1,162 @@
+import csv
+import glob
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+# Parquet and Feather go through pyarrow, which is optional; without it the
+# binary format falls back to a directory of per-column .npy files.
+try:
+    import pyarrow  # noqa: F401
+    HAVE_PYARROW = True
+except ImportError:
+    HAVE_PYARROW = False
+
+FORMATS = {
+    'csv': 'csv',
+    'parquet': 'parquet',
+    'feather': 'feather',
+    'npy': 'npy',
+}
+DEFAULT_FORMAT = 'parquet' if HAVE_PYARROW else 'npy'
+
+SCHEMA_NAME = 'schema.json'
+
+# Path of a dataset in a given format, e.g. "Helios Ridge_data.parquet"
+def data_path(name, fmt='csv', directory='.'):
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown storage format: {fmt}")
+    return os.path.join(directory, f'{name}_data.{FORMATS[fmt]}')
+
+# Give text columns a categorical dtype and parse the Time column
+def normalize_types(df):
+    for col in df.columns:
+        if col == 'Time':
+            if not pd.api.types.is_datetime64_any_dtype(df[col]):
+                df[col] = pd.to_datetime(df[col])
+        elif not (pd.api.types.is_numeric_dtype(df[col])
+                  or pd.api.types.is_datetime64_any_dtype(df[col])
+                  or isinstance(df[col].dtype, pd.CategoricalDtype)):
+            df[col] = df[col].astype('category')
+    return df
+
+def _save_npy(df, path):
+    os.makedirs(path, exist_ok=True)
+    # The schema marks a complete copy and dates it, so it goes first and
+    # is written again last
+    schema_path = os.path.join(path, SCHEMA_NAME)
+    if os.path.exists(schema_path):
+        os.remove(schema_path)
+    schema = {'columns': list(df.columns), 'categories': {}}
+    for col in df.columns:
+        values = df[col]
+        if isinstance(values.dtype, pd.CategoricalDtype):
+            schema['categories'][col] = [str(c) for c in values.cat.categories]
+            values = values.cat.codes
+        np.save(os.path.join(path, f'{col}.npy'), values.to_numpy())
+    with open(schema_path, 'w') as f:
+        json.dump(schema, f)
+
+def _load_npy(path, columns=None):
+    with open(os.path.join(path, SCHEMA_NAME)) as f:
+        schema = json.load(f)
+    data = {}
+    for col in columns or schema['columns']:
+        # Memory-mapped, so only the projected columns are ever read
+        values = np.load(os.path.join(path, f'{col}.npy'), mmap_mode='r')
+        if col in schema['categories']:
+            values = pd.Categorical.from_codes(values, schema['categories'][col])
+        data[col] = values
+    return pd.DataFrame(data)
+
+# Save a dataset in the requested format
+def save_frame(df, name, fmt='csv', directory='.'):
+    path = data_path(name, fmt, directory)
+    if fmt == 'csv':
+        df.to_csv(path, index=False)
+        return path
+
+    df = normalize_types(df.copy())
+    if fmt == 'parquet':
+        df.to_parquet(path, index=False)
+    elif fmt == 'feather':
+        df.reset_index(drop=True).to_feather(path)
+    else:
+        _save_npy(df, path)
+    return path
+
+def _read(path, fmt, columns):
+    if fmt == 'csv':
+        df = pd.read_csv(path, usecols=columns)
+        return df[columns] if columns else df
+    if fmt == 'parquet':
+        return pd.read_parquet(path, columns=columns)
+    if fmt == 'feather':
+        return pd.read_feather(path, columns=columns)
+    return _load_npy(path, columns)
+
+# When a dataset was last written in `fmt`, or None if there is no complete copy
+def modified_time(name, fmt, directory='.'):
+    path = data_path(name, fmt, directory)
+    # Rewriting the column files leaves a directory's own mtime alone
+    if fmt == 'npy':
+        path = os.path.join(path, SCHEMA_NAME)
+    try:
+        return os.path.getmtime(path)
+    except OSError:
+        return None
+
+# Load a dataset, reading only `columns` when given
+def load_frame(name, columns=None, fmt=None, directory='.'):
+    """
+    Reads `name` from its binary copy in `fmt`. When not given, the newest
+    readable copy is used, and a CSV newer than every binary copy is
+    converted to DEFAULT_FORMAT. If the binary copy is missing or older
+    than the CSV, the CSV is parsed once and converted so later loads skip
+    text parsing.
+    """
+    if fmt is None:
+        readable = [f for f in FORMATS if f in ('csv', 'npy') or HAVE_PYARROW]
+        times = {f: modified_time(name, f, directory) for f in readable}
+        times = {f: t for f, t in times.items() if t is not None}
+        # On a tie a binary copy wins, since it was converted from the CSV
+        newest = max(times, key=lambda f: (times[f], f != 'csv')) if times else 'csv'
+        fmt = DEFAULT_FORMAT if newest == 'csv' else newest
+    path = data_path(name, fmt, directory)
+    if fmt == 'csv':
+        return _read(path, fmt, columns)
+
+    csv_time = modified_time(name, 'csv', directory)
+    copy_time = modified_time(name, fmt, directory)
+    if csv_time is not None and (copy_time is None or csv_time > copy_time):
+        save_frame(pd.read_csv(data_path(name, 'csv', directory)), name, fmt, directory)
+    return _read(path, fmt, columns)
+
+# Names of all datasets in `directory`, in any storage format
+def list_datasets(directory='.'):
+    names = set()
+    for fmt, ext in FORMATS.items():
+        for path in glob.glob(os.path.join(glob.escape(directory), f'*_data.{ext}')):
+            names.add(os.path.basename(path)[:-len(f'_data.{ext}')])
+    return sorted(names)
+
+# Column names of a dataset, reading only its header or schema
+def read_columns(name, directory='.'):
+    csv_path = data_path(name, 'csv', directory)
+    if os.path.exists(csv_path):
+        with open(csv_path, newline='') as f:
+            return next(csv.reader(f), [])
+    npy_path = data_path(name, 'npy', directory)
+    if os.path.exists(npy_path):
+        with open(os.path.join(npy_path, SCHEMA_NAME)) as f:
+            return json.load(f)['columns']
+    if HAVE_PYARROW:
+        import pyarrow.parquet
+        import pyarrow.feather
+        if os.path.exists(data_path(name, 'parquet', directory)):
+            return pyarrow.parquet.read_schema(data_path(name, 'parquet', directory)).names
+        if os.path.exists(data_path(name, 'feather', directory)):
+            return pyarrow.feather.read_table(data_path(name, 'feather', directory), columns=[]).schema.names
+    return []
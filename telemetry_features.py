@@ -0,0 +1,158 @@
+import argparse
+
+import numpy as np
+import pandas as pd
+
+import storage
+
+# Trailing time windows, each covering (t - window, t] for a reading at time t
+WINDOWS = {
+    '1d': np.timedelta64(1, 'D'),
+    '7d': np.timedelta64(7, 'D'),
+    '30d': np.timedelta64(30, 'D'),
+}
+
+# Numeric telemetry columns windowed for each rover area
+FEATURE_COLUMNS = {
+    'Farming_Rover_Area': ['Temperature', 'Precipitation', 'Sunlight', 'Soil_Quality'],
+    'Recycling_Rover_Area': ['Water_Quality', 'Nutrient_Levels', 'Oxygen_Content', 'Water_Level'],
+}
+
+# Names of the features produced for `columns`, in output order
+def feature_names(columns, windows=WINDOWS):
+    return [f'{col}_{stat}_{window}'
+            for window in windows for stat in ('mean', 'var', 'lag') for col in columns]
+
+# Streaming state for rolling means, variances and as-of lags
+def start_window_state(columns, windows=WINDOWS, capacity=1024):
+    """
+    Returns a dict holding the readings still inside the longest window,
+    with running prefix sums of their counts, values and squared values.
+    Each new reading costs one append and a binary search per window,
+    however long the history, so the same state serves a multi-year
+    replay and live, one-reading-at-a-time inference.
+    """
+    k = len(columns)
+    state = {
+        'columns': list(columns),
+        'windows': {name: np.timedelta64(window, 'ns').astype(np.int64) for name, window in windows.items()},
+        'times': np.empty(capacity, dtype=np.int64),
+        'values': np.empty((capacity, k)),
+        # Prefix sums of non-missing counts, values and squared values; the
+        # values are shifted by the first readings seen to keep the sums small
+        'sums': np.empty((capacity, 3, k)),
+        'shift': None,
+        'start': 0,
+        'end': 1,
+    }
+    # A sentinel reading before all history: lags reaching past the start
+    # find its NaN values, and window sums always have a row to difference
+    state['times'][0] = np.iinfo(np.int64).min
+    state['values'][0] = np.nan
+    state['sums'][0] = 0.0
+    return state
+
+def _reserve(state, n):
+    start, end = state['start'], state['end']
+    capacity = len(state['times'])
+    if end + n <= capacity:
+        return
+    # Move the live rows to the front (growing if they still do not fit) and
+    # re-base the prefix sums on the first of them; the copy is amortized
+    # over the rows that were dropped or the capacity that was added
+    live = end - start
+    capacity = max(capacity, 2 * (live + n))
+    times = np.empty(capacity, dtype=np.int64)
+    values = np.empty((capacity, len(state['columns'])))
+    sums = np.empty((capacity, 3, len(state['columns'])))
+    times[:live] = state['times'][start:end]
+    values[:live] = state['values'][start:end]
+    sums[:live] = state['sums'][start:end] - state['sums'][start]
+    state.update(times=times, values=values, sums=sums, start=0, end=live)
+
+# Window features for the next readings, which must not be older than the last ones
+def update_window_arrays(state, times, values):
+    """
+    `times` is a datetime64 array of length N and `values` an (N, k)
+    array in the order of state['columns']. Returns an (N, 3 * k * W)
+    array laid out as feature_names(columns, windows).
+    """
+    times = np.asarray(times, dtype='datetime64[ns]').astype(np.int64)
+    values = np.asarray(values, dtype=np.float64).reshape(len(times), len(state['columns']))
+    n = len(times)
+    if n == 0:
+        return np.empty((0, 3 * values.shape[1] * len(state['windows'])))
+    if np.any(np.diff(times) < 0) or times[0] < state['times'][state['end'] - 1]:
+        raise ValueError("Telemetry readings must arrive in time order")
+    if state['shift'] is None:
+        present = ~np.isnan(values)
+        state['shift'] = np.where(present, values, 0.0).sum(axis=0) / np.maximum(present.sum(axis=0), 1)
+
+    _reserve(state, n)
+    start, end = state['start'], state['end']
+    stop = end + n
+    state['times'][end:stop] = times
+    state['values'][end:stop] = values
+
+    present = ~np.isnan(values)
+    shifted = np.where(present, values - state['shift'], 0.0)
+    increments = np.stack([present.astype(np.float64), shifted, shifted ** 2], axis=1)
+    state['sums'][end:stop] = state['sums'][end - 1] + np.cumsum(increments, axis=0)
+
+    buffered_times = state['times'][start:stop]
+    current = state['sums'][end:stop]
+    outputs = []
+    for window in state['windows'].values():
+        # Last reading at or before t - window: its prefix sums are subtracted
+        # for the window, and its values are the as-of lag
+        before = np.searchsorted(buffered_times, times - window, side='right') - 1 + start
+        count, total, squares = np.moveaxis(current - state['sums'][before], 1, 0)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            mean = total / count
+            variance = np.maximum(squares / count - mean ** 2, 0.0)
+        outputs += [mean + state['shift'], variance, state['values'][before]]
+
+    # Keep only what the longest window (and its lag) can still reach
+    longest = max(state['windows'].values())
+    state['start'] = int(np.searchsorted(buffered_times, times[-1] - longest, side='right') - 1 + start)
+    state['end'] = stop
+    return np.concatenate(outputs, axis=1)
+
+# Window features for a chunk of telemetry with a 'Time' column, as a frame on the chunk's index
+def update_window_features(state, chunk):
+    features = update_window_arrays(state, chunk['Time'].to_numpy(), chunk[state['columns']].to_numpy())
+    names = feature_names(state['columns'], state['windows'])
+    return pd.DataFrame(features, columns=names, index=chunk.index)
+
+# Window features for a whole time-ordered frame, in one pass
+def window_features(df, columns, windows=WINDOWS):
+    return update_window_features(start_window_state(columns, windows), df)
+
+# Replay a telemetry file in chunks, yielding each chunk with its window features
+def iter_window_features(name, columns=None, chunk_size=100_000, windows=WINDOWS):
+    state = start_window_state(columns or FEATURE_COLUMNS[name], windows)
+    for chunk in pd.read_csv(storage.data_path(name), chunksize=chunk_size, parse_dates=['Time']):
+        yield chunk, update_window_features(state, chunk)
+
+# Window features for a single live reading, as a dict keyed like feature_names
+def live_window_features(state, time, conditions):
+    values = [conditions[col] for col in state['columns']]
+    features = update_window_arrays(state, np.array([time], dtype='datetime64[ns]'), [values])[0]
+    names = feature_names(state['columns'], state['windows'])
+    return dict(zip(names, features.tolist()))
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compute rolling-window features over a rover telemetry file.")
+    parser.add_argument('area', choices=list(FEATURE_COLUMNS))
+    parser.add_argument('--chunk-size', type=int, default=100_000)
+    parser.add_argument('--output', help="CSV file for the telemetry with its window features")
+    args = parser.parse_args()
+
+    rows = 0
+    for i, (chunk, features) in enumerate(iter_window_features(args.area, chunk_size=args.chunk_size)):
+        if args.output:
+            # First chunk truncates the file and writes the header, the rest append
+            pd.concat([chunk, features], axis=1).to_csv(args.output, mode='w' if i == 0 else 'a',
+                                                        header=i == 0, index=False)
+        rows += len(chunk)
+        print(f"{args.area}: {rows} rows processed", flush=True)
@@ -0,0 +1,116 @@
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+# Forest hyperparameters shared by the rover models
+FOREST_PARAMS = {'n_estimators': 100, 'random_state': 42}
+
+# Best hyperparameters found by tuning.py, per model name ('rover_1',
+# 'farming', 'recycling'); they override FOREST_PARAMS when present
+TUNED_PARAMS_PATH = 'tuned_params.json'
+
+# Cores used to fit each forest; -1 means all of them. Kept out of
+# FOREST_PARAMS since it does not change the fitted trees.
+N_JOBS = -1
+
+# Cores used to predict with a fitted forest. None (one) avoids a joblib
+# dispatch on every call, which costs more than it saves on small inputs.
+PREDICT_N_JOBS = None
+
+# Rows from which predict_batch spreads a prediction over N_JOBS cores
+PARALLEL_PREDICT_ROWS = 10_000
+
+# Build a forest of the given class with the shared defaults
+def build_forest(forest_class, n_jobs=None, **params):
+    return forest_class(**{**FOREST_PARAMS, **params}, n_jobs=N_JOBS if n_jobs is None else n_jobs)
+
+# Fit a forest with its fitting cores, then switch it to PREDICT_N_JOBS
+def fit_forest(model, X, y):
+    model.fit(X, y)
+    model.set_params(n_jobs=PREDICT_N_JOBS)
+    return model
+
+# Predict a batch of rows, on N_JOBS cores when there are enough of them
+def predict_batch(model, X):
+    if len(X) < PARALLEL_PREDICT_ROWS:
+        return model.predict(X)
+    import joblib
+
+    # Forests fitted by fit_forest leave n_jobs as None, which defers to
+    # this (thread-local) setting
+    with joblib.parallel_config(n_jobs=N_JOBS):
+        return model.predict(X)
+
+# Add `extra_trees` trees fitted on (X, y) to an already fitted forest
+def grow_forest(model, X, y, extra_trees, random_state=None, n_jobs=None):
+    """
+    Uses warm_start, so the existing trees are kept as they are and only
+    the new ones are fitted, on whatever data is passed in. Pass a new
+    `random_state` for each call when trees are also being dropped:
+    otherwise the new trees' seeds depend only on the forest's size and
+    repeat from call to call.
+    """
+    if random_state is not None:
+        model.set_params(random_state=random_state)
+    model.set_params(warm_start=True, n_estimators=len(model.estimators_) + extra_trees,
+                     n_jobs=N_JOBS if n_jobs is None else n_jobs)
+    return fit_forest(model, X, y)
+
+# Run independent training jobs at the same time
+def fit_concurrently(jobs, max_workers=None):
+    """
+    `jobs` is a list of callables taking an `n_jobs` argument, e.g.
+    lambdas wrapping a train_* function. Tree fitting releases the GIL,
+    so threads are enough to run the jobs side by side; the cores are
+    split between them rather than each fitting on all of them.
+    Returns their results in order.
+    """
+    workers = max_workers or len(jobs)
+    cores = max(1, (os.cpu_count() or 1) // workers)
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(job, cores) for job in jobs]
+        return [future.result() for future in futures]
+
+# Tuned hyperparameters of a model, or {} if it has not been tuned
+def tuned_params(name, path=TUNED_PARAMS_PATH):
+    try:
+        with open(path) as f:
+            return json.load(f).get(name, {})
+    except (OSError, ValueError):
+        return {}
+
+# Record the tuned hyperparameters of a model, keeping those of the others
+def save_tuned_params(name, params, path=TUNED_PARAMS_PATH):
+    try:
+        with open(path) as f:
+            tuned = json.load(f)
+    except (OSError, ValueError):
+        tuned = {}
+    tuned[name] = params
+    with open(path, 'w') as f:
+        json.dump(tuned, f, indent=2, sort_keys=True)
+
+# Row order used for the train/test split; matches
+# train_test_split(test_size=0.2, random_state=42), whose test rows are
+# the first n_test entries of the permutation and train rows the rest
+def split_order(n_rows, test_size=0.2, random_state=42):
+    n_test = int(np.ceil(test_size * n_rows))
+    order = np.random.RandomState(random_state).permutation(n_rows)
+    return order, n_test
+
+# Split arrays or frames into X_train, X_test, y_train, y_test, as train_test_split does
+def split_rows(X, y, test_size=0.2, random_state=42):
+    order, n_test = split_order(len(X), test_size, random_state)
+    train, test = order[n_test:], order[:n_test]
+
+    def take(a, rows):
+        return a.iloc[rows] if hasattr(a, 'iloc') else a[rows]
+
+    return take(X, train), take(X, test), take(y, train), take(y, test)
+
+# Cross-validation folds over n_rows rows, as (train, test) index arrays
+def cv_folds(n_rows, cv=3, random_state=42):
+    tests = np.array_split(np.random.RandomState(random_state).permutation(n_rows), cv)
+    return [(np.concatenate(tests[:i] + tests[i + 1:]), test) for i, test in enumerate(tests)]
@@ -0,0 +1,233 @@
+import argparse
+import hashlib
+import itertools
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing import shared_memory
+
+import numpy as np
+
+import training
+
+CACHE_DIR = '.tuning_cache'
+
+# Fewest training rows a successive-halving rung fits on
+MIN_ROWS = 50
+
+# Forest hyperparameters searched by default
+SEARCH_SPACE = {
+    'n_estimators': [50, 100, 200],
+    'max_depth': [None, 8, 16],
+    'min_samples_leaf': [1, 2, 4],
+    'max_features': ['sqrt', 0.5, 1.0],
+}
+
+# Training rows of each rover model, as (X, y, task); the held-out test
+# rows of the usual split are left out, so tuning never sees them
+def load_problem(name):
+    if name == 'rover_1':
+        import Rover_1
+        X, y, n_test = Rover_1.build_training_matrix(Rover_1.load_data())
+        return X[n_test:], y[n_test:], 'classification'
+
+    import rover_2_3
+    farming_data, recycling_data = rover_2_3.load_data()
+    if name == 'farming':
+        data, target = rover_2_3.preprocess_farming_data(farming_data)[0], 'Crop_Health'
+    elif name == 'recycling':
+        data, target = rover_2_3.preprocess_recycling_data(recycling_data), 'Waste_Reduction'
+    else:
+        raise ValueError(f"Unknown model: {name}")
+    X = data.drop(columns=[target]).to_numpy(dtype=np.float32)
+    y = data[target].to_numpy(dtype=np.float64)
+    X_train, _, y_train, _ = training.split_rows(X, y)
+    return X_train, y_train, 'regression'
+
+# Candidate hyperparameter sets: the whole grid, or n_iter of it at random
+def candidates(space, method='grid', n_iter=20, seed=0):
+    grid = [dict(zip(space, values)) for values in itertools.product(*space.values())]
+    if method == 'random' and n_iter < len(grid):
+        picks = np.random.default_rng(seed).choice(len(grid), size=n_iter, replace=False)
+        grid = [grid[i] for i in sorted(picks)]
+    return grid
+
+# Process pool workers attach to the shared X and y once, at start-up
+_shared = {}
+
+def _share(array):
+    block = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+    np.ndarray(array.shape, array.dtype, buffer=block.buf)[...] = array
+    return block, (block.name, array.shape, array.dtype.str)
+
+def _attach(X_spec, y_spec, folds, task):
+    for key, (name, shape, dtype) in (('X', X_spec), ('y', y_spec)):
+        # Workers share the parent's resource tracker, and the parent
+        # unlinks the block when the search ends
+        block = shared_memory.SharedMemory(name=name)
+        _shared[key] = np.ndarray(shape, np.dtype(dtype), buffer=block.buf)
+        _shared[key + '_block'] = block
+    _shared['folds'] = folds
+    _shared['task'] = task
+
+# Fit one candidate on one fold, on at most n_rows of its training rows
+def _evaluate(params, fold, n_rows):
+    from sklearn.ensemble import RandomForestClassifier, RandomForestRegressor
+
+    train, test = _shared['folds'][fold]
+    train = train[:n_rows]
+    forest_class = RandomForestClassifier if _shared['task'] == 'classification' else RandomForestRegressor
+    # One core per fit; the pool provides the parallelism
+    model = training.build_forest(forest_class, n_jobs=1, **params)
+    start = time.perf_counter()
+    training.fit_forest(model, _shared['X'][train], _shared['y'][train])
+    # Accuracy for the classifier, R^2 for the regressors
+    score = model.score(_shared['X'][test], _shared['y'][test])
+    return float(score), time.perf_counter() - start
+
+# Identifies the data and folds a trial ran on
+def data_key(X, y, cv, seed):
+    digest = hashlib.sha256()
+    for array in (X, y):
+        digest.update(str((array.shape, array.dtype.str)).encode())
+        digest.update(np.ascontiguousarray(array).tobytes())
+    digest.update(f'{cv}:{seed}'.encode())
+    return digest.hexdigest()
+
+def trial_key(key, params, fold, n_rows):
+    return f"{key}:{json.dumps(params, sort_keys=True)}:{fold}:{n_rows}"
+
+# Completed trials of a model's earlier searches, keyed by trial_key
+def load_trials(name, cache_dir=CACHE_DIR):
+    trials = {}
+    try:
+        with open(os.path.join(cache_dir, f'{name}.jsonl')) as f:
+            for line in f:
+                try:
+                    trial = json.loads(line)
+                except ValueError:
+                    continue  # A line cut short by an interrupted search
+                trials[trial['key']] = trial
+    except OSError:
+        pass
+    return trials
+
+# Cross-validated hyperparameter search over a process pool
+def search(name, space=SEARCH_SPACE, method='halving', n_iter=20, cv=3, factor=3,
+           min_rows=None, workers=None, seed=0, cache_dir=CACHE_DIR, problem=None):
+    """
+    Runs rungs of trials, one trial being one candidate fitted on one
+    fold. 'grid' and 'random' candidates all use the full training rows;
+    after each fold the candidates whose mean score so far is below the
+    median are stopped. 'halving' starts every candidate on `min_rows`
+    rows and keeps the best 1/`factor` of them at each rung, on `factor`
+    times the rows. X and y are shared with the workers through shared
+    memory, and every finished trial is appended to a JSON-lines cache,
+    so an interrupted search resumes where it stopped.
+
+    Returns every candidate ranked best first, as dicts with their params,
+    mean score (over their last rung, for halving), the number of rows
+    and folds it was scored on, and whether it survived to the end.
+    """
+    X, y, task = problem if problem is not None else load_problem(name)
+    folds = training.cv_folds(len(X), cv, seed)
+    key = data_key(X, y, cv, seed)
+    max_rows = min(len(train) for train, _ in folds)
+
+    pool_candidates = candidates(space, method if method != 'halving' else 'grid', n_iter, seed)
+    if method == 'halving':
+        if factor < 2:
+            raise ValueError(f"Halving factor must be at least 2, got {factor}")
+        # Enough rungs to narrow the candidates down to one; the last is on all rows.
+        # Counted in integers, since the float ratio of logs can overshoot (125, 5)
+        rungs = 0
+        while factor ** rungs < len(pool_candidates):
+            rungs += 1
+        schedule = [(min(max_rows, max(min_rows or MIN_ROWS, max_rows // factor ** (rungs - r))), list(range(cv)))
+                    for r in range(rungs + 1)]
+    else:
+        schedule = [(max_rows, [fold]) for fold in range(cv)]
+
+    os.makedirs(cache_dir, exist_ok=True)
+    trials = load_trials(name, cache_dir)
+    alive = list(range(len(pool_candidates)))
+    scores = {i: [] for i in alive}
+    used_rows = {i: 0 for i in alive}
+
+    X_block, X_spec = _share(X)
+    y_block, y_spec = _share(y)
+    try:
+        with open(os.path.join(cache_dir, f'{name}.jsonl'), 'a') as log, \
+                ProcessPoolExecutor(max_workers=workers, initializer=_attach,
+                                    initargs=(X_spec, y_spec, folds, task)) as pool:
+            for rung, (n_rows, rung_folds) in enumerate(schedule):
+                if method == 'halving':
+                    # Each rung rescores its candidates on all folds at more rows;
+                    # eliminated candidates keep the scores of their last rung
+                    for i in alive:
+                        scores[i] = []
+                futures = {}
+                for i in alive:
+                    used_rows[i] = n_rows
+                    for fold in rung_folds:
+                        tkey = trial_key(key, pool_candidates[i], fold, n_rows)
+                        if tkey in trials:
+                            scores[i].append(trials[tkey]['score'])
+                        else:
+                            futures[pool.submit(_evaluate, pool_candidates[i], fold, n_rows)] = (i, fold, tkey)
+
+                for future in as_completed(futures):
+                    i, fold, tkey = futures[future]
+                    score, seconds = future.result()
+                    scores[i].append(score)
+                    trials[tkey] = {'key': tkey, 'params': pool_candidates[i], 'fold': fold,
+                                    'rows': n_rows, 'score': score, 'seconds': seconds}
+                    log.write(json.dumps(trials[tkey]) + '\n')
+                    log.flush()
+
+                print(f"{name}: rung {rung + 1}/{len(schedule)}, {len(alive)} candidates on "
+                      f"{n_rows} rows, {len(futures)} new trials", flush=True)
+                if rung == len(schedule) - 1:
+                    break
+                means = {i: np.mean(scores[i]) for i in alive}
+                if method == 'halving':
+                    keep = max(1, len(alive) // factor)
+                    alive = sorted(alive, key=lambda i: -means[i])[:keep]
+                else:
+                    median = np.median(list(means.values()))
+                    alive = [i for i in alive if means[i] >= median]
+    finally:
+        for block in (X_block, y_block):
+            block.close()
+            block.unlink()
+
+    results = [{'params': pool_candidates[i], 'mean_score': float(np.mean(scores[i])),
+                'rows': used_rows[i], 'folds': len(scores[i]), 'finished': i in alive}
+               for i in scores if scores[i]]
+    # Candidates that survived every rung (or, for grid and random, every fold)
+    # rank first; those stopped early follow, later-stopped (more rows or
+    # folds) first, since scores on fewer rows are not comparable
+    return sorted(results, key=lambda r: (not r['finished'], -r['rows'], -r['folds'], -r['mean_score']))
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Tune the rover models' forest hyperparameters.")
+    parser.add_argument('model', choices=['rover_1', 'farming', 'recycling'])
+    parser.add_argument('--method', choices=['grid', 'random', 'halving'], default='halving')
+    parser.add_argument('--n-iter', type=int, default=20, help="Candidates drawn by the random search")
+    parser.add_argument('--cv', type=int, default=3)
+    parser.add_argument('--factor', type=int, default=3, help="Halving rate of successive halving")
+    parser.add_argument('--min-rows', type=int, help="Training rows of the first halving rung")
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--save', action='store_true',
+                        help=f"Record the best hyperparameters in {training.TUNED_PARAMS_PATH}")
+    args = parser.parse_args()
+
+    results = search(args.model, method=args.method, n_iter=args.n_iter, cv=args.cv, factor=args.factor,
+                     min_rows=args.min_rows, workers=args.workers, seed=args.seed)
+    for result in results[:5]:
+        print(f"{result['mean_score']:.4f} ({result['folds']} folds, {result['rows']} rows) {result['params']}")
+    if args.save:
+        training.save_tuned_params(args.model, results[0]['params'])
+        print(f"Best hyperparameters for {args.model} saved to {training.TUNED_PARAMS_PATH}.")
@@ -1,12 +1,20 @@
+import argparse
+import csv
+import json
+import sys
+
 import numpy as np
-import matplotlib.pyplot as plt
-from matplotlib.animation import FuncAnimation
 
+# matplotlib is imported inside the plotting functions, so compute-only use
+# (the library API and the CLI) never pays for loading it.
 
 LIGHT_SPEED = 299792458  # Speed light in m/s.
 GRAVITATIONAL_CONSTANT = 6.67430e-11
 DISTANCE_ALPHA_CENTAURI = 4.367 * 9.46e15
 
+OBSTACLES = ["Meteor Shower", "Gravitational Anomaly", "Cosmic Radiation"]
+OBSTACLE_MULTIPLIERS = np.array([1.1, 1.2, 1.15])  # Same order as OBSTACLES
+
 def calculate_travel_time(warp_factor): # Calculate  traveling time.
     if warp_factor < 1:
         raise ValueError("Warp factor must be >= 1")
@@ -22,9 +30,9 @@ def calculate_energy_requirement(warp_factor):
     return energy
 
 
-def simulate_obstacles(travel_time_years): # obstacle in our journey.
+def simulate_obstacles(travel_time_years, rng=None): # obstacle in our journey.
     obstacles = ["Meteor Shower", "Gravitational Anomaly", "Cosmic Radiation"]
-    encountered_obstacle = np.random.choice(obstacles)
+    encountered_obstacle = str((np.random if rng is None else rng).choice(obstacles))
     obstacle_energy_multiplier = {
         "Meteor Shower": 1.1,
         "Gravitational Anomaly": 1.2,
@@ -32,16 +40,62 @@ def simulate_obstacles(travel_time_years): # obstacle in our journey.
     }
     return encountered_obstacle, obstacle_energy_multiplier[encountered_obstacle]
 
-def simulate_journey(warp_factor):
+def simulate_journey(warp_factor, rng=None):
     travel_time = calculate_travel_time(warp_factor)
     energy_required = calculate_energy_requirement(warp_factor)
 
-    obstacle, multiplier = simulate_obstacles(travel_time)
+    obstacle, multiplier = simulate_obstacles(travel_time, rng)
     energy_required *= multiplier
     return travel_time, energy_required, obstacle
 
 
-def visualize_warp_bubble(): # warp bubble in space fabric.
+# Draw obstacle indices into OBSTACLES for many journeys at once.
+def draw_obstacles(size, rng):
+    return rng.integers(0, len(OBSTACLES), size=size, dtype=np.int8)
+
+# Monte Carlo version of simulate_journey over an array of warp factors.
+def simulate_journeys(warp_factors, journeys=1_000_000, seed=None):
+    """
+    Simulates `journeys` journeys for every warp factor in one pass.
+    Returns a dict with the warp factors, the travel time per warp factor
+    (it does not depend on the obstacle), and (warp factors x journeys)
+    arrays of obstacle indices and energy requirements.
+    """
+    warp_factors = np.atleast_1d(np.asarray(warp_factors, dtype=float))
+    if np.any(warp_factors < 1):
+        raise ValueError("Warp factor must be >= 1")
+    rng = np.random.default_rng(seed)
+
+    travel_time = DISTANCE_ALPHA_CENTAURI / (warp_factors * LIGHT_SPEED) / (60 * 60 * 24 * 365)
+    obstacles = draw_obstacles((len(warp_factors), journeys), rng)
+    energy = calculate_energy_requirement(warp_factors)[:, None] * OBSTACLE_MULTIPLIERS[obstacles]
+    return {
+        "warp_factors": warp_factors,
+        "travel_time": travel_time,
+        "obstacles": obstacles,
+        "energy": energy,
+    }
+
+# Summary statistics of a simulate_journeys result, one row per warp factor.
+def journey_statistics(result, percentiles=(5, 50, 95)):
+    energy = result["energy"]
+    stats = {
+        "warp_factor": result["warp_factors"],
+        "travel_time_years": result["travel_time"],
+        "energy_mean": energy.mean(axis=1),
+        "energy_std": energy.std(axis=1),
+    }
+    for p, values in zip(percentiles, np.percentile(energy, percentiles, axis=1)):
+        stats[f"energy_p{p}"] = values
+    counts = np.apply_along_axis(np.bincount, 1, result["obstacles"], minlength=len(OBSTACLES))
+    for i, obstacle in enumerate(OBSTACLES):
+        stats[f"p_{obstacle.lower().replace(' ', '_')}"] = counts[:, i] / energy.shape[1]
+    return stats
+
+
+def visualize_warp_bubble(show=True): # warp bubble in space fabric.
+    import matplotlib.pyplot as plt
+
     fig = plt.figure()
     ax = fig.add_subplot(111, projection='3d')
     u = np.linspace(0, 2 * np.pi, 100)
@@ -52,101 +106,267 @@ def visualize_warp_bubble(): # warp bubble in space fabric.
 
     ax.plot_surface(x, y, z, color='purple', alpha=0.7)
     ax.set_title("Warp Bubble Visualization")
-    plt.show()
+    if show:
+        plt.show()
+    return fig
 
 
-def animate_journey(warp_factor):
+# Positions of the shuttle at every frame, starting from the origin.
+def journey_trajectory(warp_factor, frames=100):
+    num = np.arange(frames)
+    x = np.concatenate(([0.0], num * warp_factor * 1e12))
+    y = np.concatenate(([0.0], np.sin(num * 0.1) * 1e11))
+    z = np.concatenate(([0.0], np.cos(num * 0.1) * 1e11))
+    return x, y, z
+
+
+def animate_journey(warp_factor, frames=100, interval=50, blit=True, show=True):
+    import matplotlib.pyplot as plt
+    from matplotlib.animation import FuncAnimation
+
     fig = plt.figure()
     ax = fig.add_subplot(111, projection='3d')
 
-                  # Initial positions on shuttle in bubble.
-    x = [0]
-    y = [0]
-    z = [0]
+    # Whole trajectory is computed up front; each frame only shows a longer
+    # prefix of it, so no frame has to clear the axes or redraw old points.
+    x, y, z = journey_trajectory(warp_factor, frames)
+    ax.set_xlim(x.min(), x.max())
+    ax.set_ylim(y.min(), y.max())
+    ax.set_zlim(z.min(), z.max())
+    points, = ax.plot([], [], [], linestyle='', marker='o', color="purple", label="Rocket Position")
+    ax.set_title("Journey to Alpha Centauri")
+    ax.legend()
 
     def update(num):
-        x.append(num * warp_factor * 1e12)
-        y.append(np.sin(num * 0.1) * 1e11)
-        z.append(np.cos(num * 0.1) * 1e11)
-        ax.clear()
-        ax.scatter(x, y, z, color="purple", label="Rocket Position")
-        ax.set_title("Journey to Alpha Centauri")
-        ax.legend()
+        points.set_data_3d(x[:num + 2], y[:num + 2], z[:num + 2])  # Views, not copies
+        return points,
 
-    ani = FuncAnimation(fig, update, frames=100, repeat=False)
-    plt.show()
+    ani = FuncAnimation(fig, update, frames=frames, interval=interval, blit=blit, repeat=False)
+    if show:
+        plt.show()
+    return fig, ani
 
              #  -----------------plots--------------------#
                       #1
-def plot_energy_vs_warp():
+def plot_energy_vs_warp(show=True):
+    import matplotlib.pyplot as plt
+
     warp_factors = np.linspace(1, 10, 100)
     energies = [calculate_energy_requirement(wf) for wf in warp_factors]
+    fig = plt.figure()
     plt.plot(warp_factors, energies, color='green')
     plt.title("Energy Requirement vs Warp Factor")
     plt.xlabel("Warp Factor")
     plt.ylabel("Energy (Joules)")
-    plt.show()
+    if show:
+        plt.show()
+    return fig
 
                       #2
-def plot_travel_time_vs_warp():
+def plot_travel_time_vs_warp(show=True):
+    import matplotlib.pyplot as plt
+
     warp_factors = np.linspace(4, 10, 100)
     times = [calculate_travel_time(wf) for wf in warp_factors]
+    fig = plt.figure()
     plt.plot(warp_factors, times, color='blue')
     plt.title("Travel Time vs Warp Factor")
     plt.xlabel("Warp Factor")
     plt.ylabel("Travel Time (Years)")
-    plt.show()
+    if show:
+        plt.show()
+    return fig
 
                       #3
-def plot_resource_depletion(initial_population, resources):
-    growth_rate = 1
-    years = 2
-    population = initial_population
-    resource_levels = []
-    for year in range(1, years + 1):
-        population *= growth_rate
-        resources -= population * 100
-        resource_levels.append(resources if resources > 0 else 0)
+def plot_resource_depletion(initial_population, resources, growth_rate=1, years=2, show=True):
+    import matplotlib.pyplot as plt
+
+    colony = simulate_colonies(initial_population, resources, growth_rate, years, track=True)
+    resource_levels = np.maximum(colony["resource_levels"], 0)
+    fig = plt.figure()
     plt.plot(range(1, years + 1), resource_levels, color='green')
     plt.title("Colony Resource Depletion")
     plt.xlabel("Years")
     plt.ylabel("Remaining Resources")
-    plt.show()
+    if show:
+        plt.show()
+    return fig
 
                       #4
-def plot_trajectory_2d(warp_factor):
+def plot_trajectory_2d(warp_factor, show=True):
+    import matplotlib.pyplot as plt
+
     t = np.linspace(0, 10, 100)
     x = warp_factor * t * 1e12
     y = np.sin(t) * 1e11
+    fig = plt.figure()
     plt.plot(x, y, color='purple')
     plt.title("Top-down View of Spacecraft Trajectory")
     plt.xlabel("X Position (meters)")
     plt.ylabel("Y Position (meters)")
-    plt.show()
+    if show:
+        plt.show()
+    return fig
 
                        #5
-def plot_obstacle_frequency(simulations=10):
-    obstacles = ["Meteor Shower", "Gravitational Anomaly", "Cosmic Radiation"]
-    counts = {obstacle: 0 for obstacle in obstacles}
-    for _ in range(simulations):
-        obstacle, _ = simulate_obstacles(1)
-        counts[obstacle] += 1
-    plt.bar(counts.keys(), counts.values(), color='lightblue')
+def plot_obstacle_frequency(simulations=10, seed=None, show=True):
+    import matplotlib.pyplot as plt
+
+    obstacles = draw_obstacles(simulations, np.random.default_rng(seed))
+    counts = np.bincount(obstacles, minlength=len(OBSTACLES))
+    fig = plt.figure()
+    plt.bar(OBSTACLES, counts, color='lightblue')
     plt.title("Obstacle Frequency in Simulations")
     plt.ylabel("Frequency")
-    plt.show()
+    if show:
+        plt.show()
+    return fig
+
+# Colony simulation kernel shared by colony_setup, plot_resource_depletion and the sweeps.
+def simulate_colonies(initial_population, resources, growth_rate=1.0, years=2, track=False):
+    """
+    Steps any number of colonies (broadcast arrays of populations,
+    resources and growth rates) through `years` years at once. Each year
+    the population grows by `growth_rate` and consumes 100 resources per
+    member. Returns a dict with the final population and resources, the
+    first year resources ran out (0 if they never did) and, with
+    `track`, the (years, ...) history of remaining resources.
+    """
+    population, resources, growth_rate = np.broadcast_arrays(
+        np.asarray(initial_population, dtype=float), np.asarray(resources, dtype=float),
+        np.asarray(growth_rate, dtype=float))
+    failure_year = np.zeros(population.shape, dtype=np.int32)
+    resource_levels = np.empty((years,) + population.shape) if track else None
 
-# colony for rovers limit alarm.
-def colony_setup(initial_population, resources):
-    growth_rate = 1.0
-    years = 2
-    population = initial_population
     for year in range(1, years + 1):
-        population *= growth_rate
-        resources -= population * 100
-        if resources <= 0:
-            return f"Colony failed due to resource depletion in year {year}."
-    return f"Colony established with population {int(population)} and resources {resources} remaining."
+        population = population * growth_rate
+        resources = resources - population * 100
+        # Only the first failure counts; later years keep the mask as it is
+        failure_year = np.where((failure_year == 0) & (resources <= 0), year, failure_year)
+        if track:
+            resource_levels[year - 1] = resources
+
+    return {
+        "population": population,
+        "resources": resources,
+        "failure_year": failure_year,
+        "failed": failure_year > 0,
+        "resource_levels": resource_levels,
+    }
+
+# Text summary of a single simulate_colonies result.
+def colony_summary(colony):
+    if colony["failed"]:
+        return f"Colony failed due to resource depletion in year {colony['failure_year']}."
+    return f"Colony established with population {int(colony['population'])} and resources {float(colony['resources'])} remaining."
+
+# colony for rovers limit alarm.
+def colony_setup(initial_population, resources, growth_rate=1.0, years=2):
+    return colony_summary(simulate_colonies(initial_population, resources, growth_rate, years))
+
+# Journey and colony results for one mission, as plain values.
+def plan_mission(warp_factor, initial_population, resources, rocket_name="", growth_rate=1.0, years=2, rng=None):
+    travel_time, energy_required, obstacle = simulate_journey(warp_factor, rng)
+    colony = simulate_colonies(initial_population, resources, growth_rate, years)
+    return {
+        "rocket_name": rocket_name,
+        "warp_factor": warp_factor,
+        "initial_population": initial_population,
+        "resources": resources,
+        "travel_time_years": travel_time,
+        "energy_required_joules": energy_required,
+        "obstacle": obstacle,
+        "colony_failed": bool(colony["failed"]),
+        "failure_year": int(colony["failure_year"]),
+        "final_population": float(colony["population"]),
+        "final_resources": float(colony["resources"]),
+        "colony_result": colony_summary(colony),
+    }
+
+# Parse a whole number, rejecting fractions that int() would truncate
+def whole_number(value):
+    number = float(value)
+    if not number.is_integer():
+        raise ValueError(f"expected a whole number, got {value!r}")
+    return int(number)
+
+MISSION_FIELDS = {
+    "rocket_name": str,
+    "warp_factor": float,
+    "initial_population": whole_number,
+    "resources": float,
+    "growth_rate": float,
+    "years": whole_number,
+}
+
+# Plan every mission in `rows` (dicts of MISSION_FIELDS); invalid rows get an "error".
+def plan_missions(rows, seed=None):
+    rng = np.random.default_rng(seed)
+    results = []
+    for row in rows:
+        if not isinstance(row, dict):
+            results.append({"row": row, "error": "mission rows must be objects"})
+            continue
+        try:
+            params = {key: MISSION_FIELDS[key](value) for key, value in row.items()
+                      if key in MISSION_FIELDS and value not in (None, "")}
+            results.append(plan_mission(rng=rng, **params))
+        except (TypeError, ValueError) as e:
+            results.append({**row, "error": str(e)})
+    return results
+
+# Read mission rows from a JSON list of objects or a CSV file with a header.
+def read_missions(path):
+    with open(path, newline="") as f:
+        if not path.endswith(".json"):
+            return list(csv.DictReader(f))
+        rows = json.load(f)
+    if not isinstance(rows, list) or not all(isinstance(row, dict) for row in rows):
+        raise ValueError(f"{path} must hold a JSON list of mission objects")
+    return rows
+
+def write_results(results, output, fmt):
+    if fmt == "json":
+        json.dump(results, output, indent=2)
+        output.write("\n")
+        return
+    fields = list(dict.fromkeys(key for result in results for key in result))
+    writer = csv.DictWriter(output, fieldnames=fields)
+    writer.writeheader()
+    writer.writerows(results)
+
+# Non-interactive entry point: one mission from arguments, or a batch file.
+def cli(argv=None):
+    parser = argparse.ArgumentParser(description="Plan Alpha Centauri missions without prompts or windows.")
+    parser.add_argument("--batch", help="JSON or CSV file with one mission per row")
+    parser.add_argument("--rocket-name", default="")
+    parser.add_argument("--warp-factor", type=float)
+    parser.add_argument("--population", type=int, dest="initial_population")
+    parser.add_argument("--resources", type=float)
+    parser.add_argument("--growth-rate", type=float, default=1.0)
+    parser.add_argument("--years", type=int, default=2)
+    parser.add_argument("--seed", type=int)
+    parser.add_argument("--format", choices=["json", "csv"], default="json")
+    parser.add_argument("--output", help="Output file (default: stdout)")
+    args = parser.parse_args(argv)
+
+    if args.batch:
+        try:
+            rows = read_missions(args.batch)
+        except (OSError, ValueError) as e:
+            parser.error(str(e))
+    elif None in (args.warp_factor, args.initial_population, args.resources):
+        parser.error("--warp-factor, --population and --resources are required without --batch")
+    else:
+        rows = [{key: getattr(args, key) for key in MISSION_FIELDS}]
+
+    results = plan_missions(rows, args.seed)
+    if args.output:
+        with open(args.output, "w", newline="") as f:
+            write_results(results, f, args.format)
+    else:
+        write_results(results, sys.stdout, args.format)
+    return 1 if any("error" in result for result in results) else 0
 
 # Main function
 def main():
@@ -180,4 +400,7 @@ def main():
         print(f"Error: {e}")
 
 if __name__ == "__main__":
-   main()
\ No newline at end of file
+    # With arguments run the scriptable CLI, otherwise the interactive prompts
+    if len(sys.argv) > 1:
+        sys.exit(cli())
+    main()
\ No newline at end of file
@@ -0,0 +1,87 @@
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+import storage
+import warp
+
+# Mean obstacle energy multiplier, obstacles being equally likely
+EXPECTED_MULTIPLIER = warp.OBSTACLE_MULTIPLIERS.mean()
+
+# Evaluate grid points [start, stop) of the flattened grid
+def evaluate_grid(axes, start, stop, years=2):
+    """
+    `axes` holds the warp factor, population, resource and growth rate
+    values; grid point i is their combination at np.unravel_index(i).
+    """
+    shape = tuple(len(axis) for axis in axes)
+    index = np.unravel_index(np.arange(start, stop), shape)
+    warp_factor, population, resources, growth_rate = (np.asarray(axis, dtype=float)[i]
+                                                       for axis, i in zip(axes, index))
+
+    colony = warp.simulate_colonies(population, resources, growth_rate, years)
+    return pd.DataFrame({
+        'Warp_Factor': warp_factor,
+        'Initial_Population': population,
+        'Resources': resources,
+        'Growth_Rate': growth_rate,
+        'Travel_Time': warp.DISTANCE_ALPHA_CENTAURI / (warp_factor * warp.LIGHT_SPEED) / (60 * 60 * 24 * 365),
+        'Expected_Energy': warp.calculate_energy_requirement(warp_factor) * EXPECTED_MULTIPLIER,
+        'Final_Population': colony['population'],
+        'Final_Resources': colony['resources'],
+        'Failure_Year': colony['failure_year'],
+    })
+
+def _evaluate_job(args):
+    axes, start, stop, years, name, fmt = args
+    results = evaluate_grid(axes, start, stop, years)
+    if name is None:
+        return results
+    return storage.save_frame(results, name, fmt)
+
+# Sweep the full grid, in chunks spread over a process pool
+def run_sweep(warp_factors, populations, resources, growth_rates, years=2,
+              chunk_size=1_000_000, workers=None, name=None, fmt=storage.DEFAULT_FORMAT):
+    """
+    Returns the results as one DataFrame, or, when `name` is given, has
+    each worker save its chunk as "<name>_<chunk number>" in `fmt` and
+    returns the saved paths, so large grids never sit in memory at once.
+    """
+    axes = [np.asarray(axis, dtype=float) for axis in (warp_factors, populations, resources, growth_rates)]
+    if np.any(axes[0] < 1):
+        raise ValueError("Warp factor must be >= 1")
+    total = int(np.prod([len(axis) for axis in axes]))
+    starts = range(0, total, chunk_size)
+    jobs = [(axes, start, min(start + chunk_size, total), years,
+             None if name is None else f'{name}_{i:05d}', fmt)
+            for i, start in enumerate(starts)]
+
+    # Small grids are not worth the cost of starting worker processes
+    if len(jobs) == 1:
+        results = [_evaluate_job(jobs[0])]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(_evaluate_job, jobs))
+    if name is None:
+        return pd.concat(results, ignore_index=True)
+    return results
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Sweep warp factor, population, resources and growth rate.")
+    parser.add_argument('--warp-factors', type=float, nargs='+', default=list(np.linspace(1, 10, 10)))
+    parser.add_argument('--populations', type=float, nargs='+', default=[10, 100, 1000])
+    parser.add_argument('--resources', type=float, nargs='+', default=[1e4, 1e5, 1e6])
+    parser.add_argument('--growth-rates', type=float, nargs='+', default=[1.0, 1.05, 1.1])
+    parser.add_argument('--years', type=int, default=2)
+    parser.add_argument('--chunk-size', type=int, default=1_000_000)
+    parser.add_argument('--workers', type=int)
+    parser.add_argument('--format', default=storage.DEFAULT_FORMAT, choices=list(storage.FORMATS))
+    parser.add_argument('--name', default='warp_sweep')
+    args = parser.parse_args()
+
+    paths = run_sweep(args.warp_factors, args.populations, args.resources, args.growth_rates,
+                      args.years, args.chunk_size, args.workers, args.name, args.format)
+    for path in paths:
+        print(f"Sweep results saved to {path}.")